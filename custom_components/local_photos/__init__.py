@@ -13,6 +13,7 @@ from homeassistant.exceptions import ConfigEntryNotReady
 
 from .coordinator import CoordinatorManager
 from .const import CONF_ALBUM_ID, CONF_FOLDER_PATH, DOMAIN
+from .local_photos import get_folder_options, get_photos_dir
 
 PLATFORMS = [Platform.CAMERA, Platform.SENSOR, Platform.SELECT]
 _LOGGER = logging.getLogger(__name__)
@@ -83,13 +84,28 @@ async def update_listener(hass: HomeAssistant, updated_entry: ConfigEntry):
         _LOGGER.debug("update_listener triggered (no option change)")
         return
     _LOGGER.debug("update_listener triggered (options changed)")
+    # Entries for the same folder share the photos manager, give them the same
+    # folder options so they all reload with the new ones
+    folder_options = get_folder_options(updated_options)
+    photos_dir = get_photos_dir(hass, updated_options)
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (
+            entry.entry_id != updated_entry.entry_id
+            and get_photos_dir(hass, entry.options) == photos_dir
+            and get_folder_options(entry.options) != folder_options
+        ):
+            hass.config_entries.async_update_entry(
+                entry, options={**entry.options, **folder_options}
+            )
     await hass.config_entries.async_reload(updated_entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator_manager: CoordinatorManager = entry_data.get("coordinator_manager")
+        await coordinator_manager.async_unload()
     loaded_entries = [
         entry
         for entry in hass.config_entries.async_entries(DOMAIN)
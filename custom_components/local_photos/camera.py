@@ -21,6 +21,8 @@ from .const import (
     CONF_ALBUM_ID,
 )
 from .coordinator import Coordinator, CoordinatorManager
+from .image_transform import get_content_type
+from .image_view import IMAGE_VIEW_URL, async_get_image_view
 
 SERVICE_NEXT_MEDIA = "next_media"
 ATTR_MODE = "mode"
@@ -86,6 +88,17 @@ class LocalPhotosBaseCamera(Camera):
         self.async_on_remove(
             self.coordinator.async_add_listener(self._handle_coordinator_update)
         )
+        self.async_on_remove(async_get_image_view(self.hass).async_add_camera(self))
+
+    @property
+    def entity_picture(self) -> str:
+        """Return a link to the current image.
+
+        Unlike the camera proxy the image view sends an ETag, so clients can
+        revalidate an unchanged image without downloading it again.
+        """
+        url = IMAGE_VIEW_URL.format(entity_id=self.entity_id)
+        return f"{url}?token={self.access_tokens[-1]}"
 
     async def async_update(self) -> None:
         """Update the entity.
@@ -119,11 +132,11 @@ class LocalPhotosBaseCamera(Camera):
         if write_metadata and media is not None:
             self._attr_extra_state_attributes["media_filename"] = media.filename
             
-            # MediaItem objects only have basic properties (no extended metadata)
-            # So we'll just provide basic information
+            # Metadata comes from the EXIF data indexed in the background
             self._attr_extra_state_attributes["media_metadata"] = {
                 "path": media.path,
-                "id": media.id
+                "id": media.id,
+                **media.media_metadata,
             }
             self._attr_extra_state_attributes["media_contributor_info"] = {}
             self._attr_extra_state_attributes["media_url"] = ""
@@ -132,7 +145,8 @@ class LocalPhotosBaseCamera(Camera):
                 self._attr_extra_state_attributes["secondary_media_filename"] = media_secondary.filename
                 self._attr_extra_state_attributes["secondary_media_metadata"] = {
                     "path": media_secondary.path,
-                    "id": media_secondary.id
+                    "id": media_secondary.id,
+                    **media_secondary.media_metadata,
                 }
                 self._attr_extra_state_attributes["secondary_media_contributor_info"] = {}
                 self._attr_extra_state_attributes["secondary_media_url"] = ""
@@ -156,7 +170,11 @@ class LocalPhotosBaseCamera(Camera):
         if self.coordinator.current_media is None:
             _LOGGER.warning("No media selected for %s", self.name)
             return None
-        return await self.coordinator.get_media_data(width, height)
+        data = await self.coordinator.get_media_data(width, height)
+        if data is not None:
+            # The output format depends on the settings and on the image
+            self.content_type = get_content_type(data)
+        return data
 
 
 class LocalPhotosAlbumCamera(LocalPhotosBaseCamera):
@@ -18,6 +18,18 @@ from .const import (
     CONF_ALBUM_ID,
     CONF_ALBUM_ID_FAVORITES,
     CONF_FOLDER_PATH,
+    CONF_MEMORY_CACHE_SIZE,
+    CONF_OUTPUT_QUALITY,
+    CONF_RENDER_WORKERS,
+    CONF_RENDITION_CACHE_SIZE,
+    CONF_SCAN_WORKERS,
+    CONF_WATCH_FOLDER,
+    MEMORY_CACHE_SIZE_DEFAULT_OPTION,
+    OUTPUT_QUALITY_DEFAULT_OPTION,
+    RENDER_WORKERS_DEFAULT_OPTION,
+    RENDITION_CACHE_SIZE_DEFAULT_OPTION,
+    SCAN_WORKERS_DEFAULT_OPTION,
+    WATCH_FOLDER_DEFAULT_OPTION,
 )
 
 
@@ -165,10 +177,54 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input=None):
         """Handle options flow."""
         if user_input is not None:
-            return self.async_create_entry(title="", data=self.config_entry.options)
+            return self.async_create_entry(
+                title="", data={**self.config_entry.options, **user_input}
+            )
             
+        options = self.config_entry.options
         return self.async_show_form(
             step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_WATCH_FOLDER,
+                        default=options.get(
+                            CONF_WATCH_FOLDER, WATCH_FOLDER_DEFAULT_OPTION
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_SCAN_WORKERS,
+                        default=options.get(
+                            CONF_SCAN_WORKERS, SCAN_WORKERS_DEFAULT_OPTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Optional(
+                        CONF_RENDITION_CACHE_SIZE,
+                        default=options.get(
+                            CONF_RENDITION_CACHE_SIZE,
+                            RENDITION_CACHE_SIZE_DEFAULT_OPTION,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65536)),
+                    vol.Optional(
+                        CONF_MEMORY_CACHE_SIZE,
+                        default=options.get(
+                            CONF_MEMORY_CACHE_SIZE, MEMORY_CACHE_SIZE_DEFAULT_OPTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=4096)),
+                    vol.Optional(
+                        CONF_OUTPUT_QUALITY,
+                        default=options.get(
+                            CONF_OUTPUT_QUALITY, OUTPUT_QUALITY_DEFAULT_OPTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_RENDER_WORKERS,
+                        default=options.get(
+                            CONF_RENDER_WORKERS, RENDER_WORKERS_DEFAULT_OPTION
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=32)),
+                }
+            ),
             description_placeholders={
                 "model": "Local Photos",
             },
@@ -4,15 +4,69 @@ from __future__ import annotations
 DOMAIN = "local_photos"
 MANUFACTURER = "Local Photos"
 
+# hass.data key of the photos managers shared by config entries, by photos directory
+DATA_PHOTOS_MANAGERS = f"{DOMAIN}_photos_managers"
+# hass.data key of the HTTP view serving the images of all cameras
+DATA_IMAGE_VIEW = f"{DOMAIN}_image_view"
+
 CONF_FOLDER_PATH = "folder_path"
 CONF_ALBUM_ID = "album_id"  # Kept for compatibility
 CONF_ALBUM_ID_FAVORITES = "ALL"  # Renamed from FAVORITES to ALL
 
+# Seconds between background rescans of the photos directory
+MEDIA_INDEX_RESCAN_INTERVAL = 300
+
+# Follow changes below the photos directory with inotify instead of rescanning
+CONF_WATCH_FOLDER = "watch_folder"
+WATCH_FOLDER_DEFAULT_OPTION = False
+
+# Number of directories listed in parallel during a rescan
+CONF_SCAN_WORKERS = "scan_workers"
+SCAN_WORKERS_DEFAULT_OPTION = 4
+
+# Directory in the config directory for the media index and resized images.
+# Both can be rebuilt, so unlike .storage it is left out of backups
+CACHE_DIRECTORY = ".cache"
+# Former location of the media index and resized images, moved on startup
+LEGACY_CACHE_DIRECTORY = ".storage"
+
+# Disk space in MB for resized and cropped images, 0 disables the cache
+CONF_RENDITION_CACHE_SIZE = "rendition_cache_size"
+RENDITION_CACHE_SIZE_DEFAULT_OPTION = 32
+
+# Memory in MB for recently shown images, per album
+CONF_MEMORY_CACHE_SIZE = "memory_cache_size"
+MEMORY_CACHE_SIZE_DEFAULT_OPTION = 32
+
+# Worker processes rendering images, 0 renders on the render threads
+CONF_RENDER_WORKERS = "render_workers"
+RENDER_WORKERS_DEFAULT_OPTION = 0
+# Threads rendering images and reading image headers without worker processes,
+# one more is kept for images a dashboard is waiting for
+RENDER_THREADS = 2
+
+# Options of the photos manager and their defaults. Entries for the same photos
+# directory share one manager, so these are kept the same for all of them
+FOLDER_OPTIONS = {
+    CONF_WATCH_FOLDER: WATCH_FOLDER_DEFAULT_OPTION,
+    CONF_SCAN_WORKERS: SCAN_WORKERS_DEFAULT_OPTION,
+    CONF_RENDITION_CACHE_SIZE: RENDITION_CACHE_SIZE_DEFAULT_OPTION,
+    CONF_RENDER_WORKERS: RENDER_WORKERS_DEFAULT_OPTION,
+}
+
+# Encoder quality of rendered images, 1-100
+CONF_OUTPUT_QUALITY = "output_quality"
+OUTPUT_QUALITY_DEFAULT_OPTION = 85
+
 SETTING_IMAGESELECTION_MODE_RANDOM = "Random"
 SETTING_IMAGESELECTION_MODE_ALPHABETICAL = "Alphabetical order"
+SETTING_IMAGESELECTION_MODE_DATE_TAKEN = "Date taken"
+SETTING_IMAGESELECTION_MODE_FILE_MODIFIED = "File modified"
 SETTING_IMAGESELECTION_MODE_OPTIONS = [
     SETTING_IMAGESELECTION_MODE_RANDOM,
     SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+    SETTING_IMAGESELECTION_MODE_DATE_TAKEN,
+    SETTING_IMAGESELECTION_MODE_FILE_MODIFIED,
 ]
 SETTING_IMAGESELECTION_MODE_DEFAULT_OPTION = SETTING_IMAGESELECTION_MODE_RANDOM
 
@@ -45,19 +99,51 @@ SETTING_INTERVAL_MAP = dict(
     }
 )
 
+# Seconds before the interval ends to select and render the next media
+PREFETCH_LEAD_TIME = 10
+
 CONF_WRITEMETADATA = "attribute_metadata"
 WRITEMETADATA_DEFAULT_OPTION = False
 
 SETTING_CROP_MODE_ORIGINAL = "Original"
 SETTING_CROP_MODE_CROP = "Crop"
 SETTING_CROP_MODE_COMBINED = "Combine images"
+SETTING_CROP_MODE_COMBINED_BEST_FIT = "Combine images (best fit)"
 SETTING_CROP_MODE_OPTIONS = [
     SETTING_CROP_MODE_ORIGINAL,
     SETTING_CROP_MODE_CROP,
     SETTING_CROP_MODE_COMBINED,
+    SETTING_CROP_MODE_COMBINED_BEST_FIT,
+]
+SETTING_CROP_MODES_COMBINED = [
+    SETTING_CROP_MODE_COMBINED,
+    SETTING_CROP_MODE_COMBINED_BEST_FIT,
 ]
+
+# Number of best fitting images the secondary image is picked from in best fit mode
+COMBINED_BEST_FIT_CANDIDATES = 10
 SETTING_CROP_MODE_DEFAULT_OPTION = SETTING_CROP_MODE_ORIGINAL
 
+# Format images are sent in, Automatic sends JPEG unless the image is transparent
+SETTING_OUTPUT_FORMAT_AUTO = "Automatic"
+SETTING_OUTPUT_FORMAT_JPEG = "JPEG"
+SETTING_OUTPUT_FORMAT_WEBP = "WebP"
+SETTING_OUTPUT_FORMAT_AVIF = "AVIF"
+SETTING_OUTPUT_FORMAT_OPTIONS = [
+    SETTING_OUTPUT_FORMAT_AUTO,
+    SETTING_OUTPUT_FORMAT_JPEG,
+    SETTING_OUTPUT_FORMAT_WEBP,
+    SETTING_OUTPUT_FORMAT_AVIF,
+]
+SETTING_OUTPUT_FORMAT_DEFAULT_OPTION = SETTING_OUTPUT_FORMAT_AUTO
+# Pillow format names, AVIF and WebP depend on how Pillow was built
+SETTING_OUTPUT_FORMAT_MAP = {
+    SETTING_OUTPUT_FORMAT_AUTO: None,
+    SETTING_OUTPUT_FORMAT_JPEG: "JPEG",
+    SETTING_OUTPUT_FORMAT_WEBP: "WEBP",
+    SETTING_OUTPUT_FORMAT_AVIF: "AVIF",
+}
+
 # Aspect ratio settings
 CONF_ASPECT_RATIO = "aspect_ratio"
 SETTING_ASPECT_RATIO_16_9 = "16:9"
@@ -3,15 +3,15 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime, timedelta
 
+import hashlib
 import logging
 import math
-import random
 from typing import Dict, List, Tuple, Optional
-import io
 import os
 import aiohttp
+import numpy as np
 import async_timeout
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
@@ -21,26 +21,44 @@ from homeassistant.helpers.aiohttp_client import (
     async_get_clientsession,
 )
 from homeassistant.helpers.entity import DeviceInfo
-
-from PIL import Image
-
-from .local_photos import LocalPhotosManager, Album, MediaItem
+from homeassistant.helpers.event import async_call_later
+
+from .local_photos import (
+    LocalPhotosManager,
+    Album,
+    MediaItem,
+    async_get_photos_manager,
+    async_release_photos_manager,
+)
+from .image_transform import RenderJob, RenderSource, get_oriented_size
+from .render_backend import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from .rendition_cache import MemoryRenditionCache
 from .const import (
+    COMBINED_BEST_FIT_CANDIDATES,
     CONF_ALBUM_ID,
     CONF_ALBUM_ID_FAVORITES,
     CONF_FOLDER_PATH,
+    CONF_MEMORY_CACHE_SIZE,
+    CONF_OUTPUT_QUALITY,
     CONF_WRITEMETADATA,
     DOMAIN,
     MANUFACTURER,
-    SETTING_CROP_MODE_COMBINED,
-    SETTING_CROP_MODE_CROP,
+    MEMORY_CACHE_SIZE_DEFAULT_OPTION,
+    OUTPUT_QUALITY_DEFAULT_OPTION,
+    PREFETCH_LEAD_TIME,
+    SETTING_CROP_MODE_COMBINED_BEST_FIT,
     SETTING_CROP_MODE_DEFAULT_OPTION,
     SETTING_CROP_MODE_ORIGINAL,
+    SETTING_CROP_MODES_COMBINED,
     SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+    SETTING_IMAGESELECTION_MODE_DATE_TAKEN,
     SETTING_IMAGESELECTION_MODE_DEFAULT_OPTION,
+    SETTING_IMAGESELECTION_MODE_FILE_MODIFIED,
     SETTING_IMAGESELECTION_MODE_RANDOM,
     SETTING_INTERVAL_DEFAULT_OPTION,
     SETTING_INTERVAL_MAP,
+    SETTING_OUTPUT_FORMAT_DEFAULT_OPTION,
+    SETTING_OUTPUT_FORMAT_MAP,
     WRITEMETADATA_DEFAULT_OPTION,
     SETTING_ASPECT_RATIO_DEFAULT_OPTION,
     ASPECT_RATIO_VALUES,
@@ -56,8 +74,8 @@ class CoordinatorManager:
     hass: HomeAssistant
     _config: ConfigEntry
     _photos_manager: LocalPhotosManager
-    coordinators: dict[str, Coordinator] = dict()
-    coordinator_first_refresh: dict[str, asyncio.Task] = dict()
+    coordinators: dict[str, Coordinator]
+    coordinator_first_refresh: dict[str, asyncio.Task]
 
     def __init__(
         self,
@@ -67,12 +85,17 @@ class CoordinatorManager:
         self.hass = hass
         self._config = config
         self._photos_manager = None
+        # Coordinators belong to this entry, a reload starts with new ones
+        # using the new options and photos manager
+        self.coordinators = {}
+        self.coordinator_first_refresh = {}
         
     async def initialize(self):
         """Initialize the photos manager asynchronously"""
         if self._photos_manager is None:
-            self._photos_manager = LocalPhotosManager(self.hass, self._config.options)
-            await self._photos_manager.scan_albums()
+            self._photos_manager = await async_get_photos_manager(
+                self.hass, self._config.options
+            )
 
     async def get_coordinator(self, album_id: str) -> Coordinator:
         """Get a unique coordinator for specific album_id"""
@@ -94,11 +117,37 @@ class CoordinatorManager:
         await first_refresh
         return self.coordinators[album_id]
 
+    async def async_unload(self):
+        """Drop the coordinators and release the photos manager"""
+        for coordinator in self.coordinators.values():
+            coordinator.cancel_prefetch()
+        self.coordinators.clear()
+        self.coordinator_first_refresh.clear()
+        if self._photos_manager is not None:
+            await async_release_photos_manager(self.hass, self._photos_manager)
+            self._photos_manager = None
+
+    async def async_get_diagnostics(self) -> dict:
+        """Get the cache statistics of this entry's albums"""
+        diagnostics = {}
+        if self._photos_manager is not None:
+            diagnostics["rendition_cache"] = await self.hass.async_add_executor_job(
+                self._photos_manager.rendition_cache.get_stats
+            )
+            diagnostics["render_backend"] = (
+                self._photos_manager.render_backend.get_stats()
+            )
+        diagnostics["albums"] = {
+            album_id: {"render_cache": coordinator.render_cache.get_stats()}
+            for album_id, coordinator in self.coordinators.items()
+        }
+        return diagnostics
+
     def remove_coordinator(self, album_id: str):
         """Remove coordinator instance"""
         if album_id not in self.coordinators:
             return
-        self.coordinators.pop(album_id)
+        self.coordinators.pop(album_id).cancel_prefetch()
         self.coordinator_first_refresh.pop(album_id)
 
 
@@ -112,7 +161,7 @@ class Coordinator(DataUpdateCoordinator):
     album_id: str
     current_media_primary: MediaItem | None = None
     current_media_secondary: MediaItem | None = None
-    current_media_cache: Dict[str, bytes] = {}
+    render_cache: MemoryRenditionCache
 
     # Media selection timestamp, when was this image selected to be shown,
     # used to calculate when to move to the next one
@@ -122,6 +171,7 @@ class Coordinator(DataUpdateCoordinator):
     image_selection_mode = SETTING_IMAGESELECTION_MODE_DEFAULT_OPTION
     interval = SETTING_INTERVAL_DEFAULT_OPTION
     aspect_ratio = SETTING_ASPECT_RATIO_DEFAULT_OPTION
+    output_format = SETTING_OUTPUT_FORMAT_DEFAULT_OPTION
 
     def __init__(
         self,
@@ -141,6 +191,25 @@ class Coordinator(DataUpdateCoordinator):
         self._photos_manager = photos_manager
         self._config = config
         self.album_id = album_id
+        # Next media, selected and rendered shortly before the interval ends
+        self._prefetched: Tuple[str, MediaItem, MediaItem | None] | None = None
+        self._prefetch_task: asyncio.Task | None = None
+        self._cancel_prefetch_timer = None
+        self._last_requested_size: Tuple[int, int] | None = None
+        # Renders in progress by render cache key, shared by concurrent requests
+        self._renders: Dict[Tuple, asyncio.Task] = {}
+        # Held while checking whether the interval passed and moving on
+        self._refresh_lock = asyncio.Lock()
+        # Recently rendered images of this album, keyed by media and render settings
+        self.render_cache = MemoryRenditionCache(
+            int(
+                self.get_config_option(
+                    CONF_MEMORY_CACHE_SIZE, MEMORY_CACHE_SIZE_DEFAULT_OPTION
+                )
+            )
+            * 1024
+            * 1024
+        )
 
         # Get the album from the photos manager
         self.album = self._photos_manager.get_album(album_id)
@@ -181,25 +250,35 @@ class Coordinator(DataUpdateCoordinator):
 
     def set_crop_mode(self, crop_mode: str):
         """Set crop mode"""
-        self.current_media_cache = {}
         self.crop_mode = crop_mode
 
     def set_image_selection_mode(self, image_selection_mode: str):
         """Set image selection mode"""
         self.image_selection_mode = image_selection_mode
+        self._prefetched = None
 
     def set_interval(self, interval: str):
         """Set interval"""
         self.interval = interval
+        self._schedule_prefetch()
         self.async_update_listeners()
 
     def set_aspect_ratio(self, aspect_ratio: str):
         """Set aspect ratio"""
         self.aspect_ratio = aspect_ratio
-        # Clear the cache when aspect ratio changes
-        self.current_media_cache = {}
         self.async_update_listeners()
 
+    def set_output_format(self, output_format: str):
+        """Set output format"""
+        self.output_format = output_format
+
+    @property
+    def output_quality(self) -> int:
+        """Encoder quality of rendered images"""
+        return int(
+            self.get_config_option(CONF_OUTPUT_QUALITY, OUTPUT_QUALITY_DEFAULT_OPTION)
+        )
+
     def get_config_option(self, prop, default) -> ConfigEntry:
         """Get config option."""
         if self._config.options is not None and prop in self._config.options:
@@ -218,15 +297,62 @@ class Coordinator(DataUpdateCoordinator):
         if media_id is None:
             return
         try:
-            self.current_media_selected_timestamp = datetime.now()
             media = await self._get_media_by_id(media_id)
-            self.current_media_primary = media
-            self.current_media_secondary = None
-            self.current_media_cache = {}
+            self._set_current_media(media, None)
         except Exception as err:
             _LOGGER.error("Error setting current media: %s", err)
             raise UpdateFailed(f"Error setting current media: {err}") from err
 
+    def _set_current_media(self, media: MediaItem | None, secondary: MediaItem | None):
+        """Show media and plan the prefetch of the media after it"""
+        self.current_media_selected_timestamp = datetime.now()
+        self.current_media_primary = media
+        self.current_media_secondary = secondary
+        self._prefetched = None
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        """Prefetch the next media shortly before the interval ends"""
+        self.cancel_prefetch()
+        interval = SETTING_INTERVAL_MAP.get(self.interval)
+        if interval is None or self.current_media_primary is None:
+            return
+        elapsed = (datetime.now() - self.current_media_selected_timestamp).total_seconds()
+        delay = max(0, interval - elapsed - PREFETCH_LEAD_TIME)
+        self._cancel_prefetch_timer = async_call_later(
+            self.hass, delay, self._start_prefetch
+        )
+
+    def cancel_prefetch(self):
+        """Stop a planned or running prefetch"""
+        if self._cancel_prefetch_timer is not None:
+            self._cancel_prefetch_timer()
+            self._cancel_prefetch_timer = None
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+
+    @callback
+    def _start_prefetch(self, _now):
+        """Start prefetching in the background"""
+        self._cancel_prefetch_timer = None
+        self._prefetch_task = self.hass.async_create_background_task(
+            self._async_prefetch(), f"{DOMAIN} prefetch {self.album_id}"
+        )
+
+    async def _async_prefetch(self):
+        """Select the next media and render it at the last requested size"""
+        mode = self.image_selection_mode
+        media = await self._find_next_media(mode)
+        if media is None:
+            return
+        width, height = self._last_requested_size or self._get_render_size(None, None)
+        _, secondary = await self._async_render_once(
+            media, None, width, height, PRIORITY_BACKGROUND
+        )
+        self._prefetched = (mode, media, secondary)
+        _LOGGER.debug("Prefetched %s for album %s", media.filename, self.album_id)
+
     async def _get_media_by_id(self, media_id: str) -> MediaItem:
         """Get media by id"""
         try:
@@ -248,44 +374,69 @@ class Coordinator(DataUpdateCoordinator):
         if interval is None:
             return False
 
-        time_delta = (
-            datetime.now() - self.current_media_selected_timestamp
-        ).total_seconds()
-        if time_delta > interval or self.current_media is None:
-            await self.select_next()
-            return True
+        # Concurrent requests after the interval passed move on only once, the
+        # others wait and then find the interval restarted
+        async with self._refresh_lock:
+            time_delta = (
+                datetime.now() - self.current_media_selected_timestamp
+            ).total_seconds()
+            if time_delta > interval or self.current_media is None:
+                await self.select_next()
+                return True
         return False
 
     async def select_next(self, mode=None):
         """Select next media based on config"""
         mode = mode or self.image_selection_mode
-        if mode.lower() == SETTING_IMAGESELECTION_MODE_ALPHABETICAL.lower():
-            await self._select_sequential_media()
-        else:
-            await self._select_random_media()
-
-    async def _select_random_media(self):
-        """Selects a random media item from the list"""
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            # The next media is being rendered, waiting is quicker than starting
+            # over. Someone is waiting for it now, so it goes before background work
+            with self._photos_manager.render_backend.boost(self):
+                await asyncio.wait({self._prefetch_task})
+        prefetched = self._prefetched
+        if prefetched is not None and prefetched[0].lower() == mode.lower():
+            # Swap in the prefetched media, its image is in the render cache
+            self._set_current_media(prefetched[1], prefetched[2])
+            return
+        media = await self._find_next_media(mode)
+        if media:
+            self._set_current_media(media, None)
+
+    async def _find_next_media(self, mode: str) -> MediaItem | None:
+        """Find the media to show after the current media"""
+        for order in (
+            SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+            SETTING_IMAGESELECTION_MODE_DATE_TAKEN,
+            SETTING_IMAGESELECTION_MODE_FILE_MODIFIED,
+        ):
+            if mode.lower() == order.lower():
+                return await self._find_sequential_media(order)
+        return await self._find_random_media()
+
+    async def _find_random_media(self) -> MediaItem | None:
+        """Finds a random media item from the list"""
         try:
             media = await self._photos_manager.get_random_media_item(self.album_id)
-            if media:
-                await self.set_current_media_with_id(media.id)
-            else:
+            if not media:
                 _LOGGER.warning("No media found in album %s", self.album_id)
+            return media
         except Exception as err:
             _LOGGER.error("Error selecting random media: %s", err)
+            return None
 
-    async def _select_sequential_media(self):
-        """Finds the current photo in the alphabetically sorted list, and moves to the next"""
+    async def _find_sequential_media(self, order: str) -> MediaItem | None:
+        """Finds the current photo in the list sorted by order, and returns the next"""
         try:
             current_media_id = self.current_media_id()
-            media = await self._photos_manager.get_next_media_item(self.album_id, current_media_id)
-            if media:
-                await self.set_current_media_with_id(media.id)
-            else:
+            media = await self._photos_manager.get_next_media_item(
+                self.album_id, current_media_id, order
+            )
+            if not media:
                 _LOGGER.warning("No media found in album %s", self.album_id)
+            return media
         except Exception as err:
             _LOGGER.error("Error selecting sequential media: %s", err)
+            return None
             
     async def _get_random_media(self):
         """Get a random media item"""
@@ -300,6 +451,49 @@ class Coordinator(DataUpdateCoordinator):
         if self.current_media_primary is None:
             return None
 
+        width, height = self._get_render_size(width, height)
+        # Pre-render the next media at the size the dashboard asks for
+        self._last_requested_size = (width, height)
+
+        cached = self.render_cache.get(
+            self._render_cache_key(
+                self.current_media_primary,
+                self.current_media_secondary,
+                width,
+                height,
+            )
+        )
+        if cached is not None:
+            return cached
+
+        primary = self.current_media_primary
+        result, secondary = await self._async_render_once(
+            primary, self.current_media_secondary, width, height
+        )
+        if primary is self.current_media_primary:
+            self.current_media_secondary = secondary
+        if result is not None:
+            self.async_update_listeners()
+        return result
+
+    def get_media_etag(
+        self, width: int | None = None, height: int | None = None
+    ) -> str | None:
+        """Get a strong ETag of the current media rendered at the given size
+
+        Changes whenever get_media_data would return different data, so it can
+        be compared without rendering. None if no media is selected.
+        """
+        if self.current_media_primary is None:
+            return None
+        width, height = self._get_render_size(width, height)
+        key = self._render_cache_key(
+            self.current_media_primary, self.current_media_secondary, width, height
+        )
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def _get_render_size(self, width: int | None, height: int | None) -> Tuple[int, int]:
+        """Get the size to render, filling in missing dimensions from the aspect ratio"""
         # If no dimensions are provided, use default dimensions based on aspect ratio
         if width is None or height is None:
             # Get aspect ratio values
@@ -314,72 +508,180 @@ class Coordinator(DataUpdateCoordinator):
             elif height is None:
                 # If only width is provided, calculate height based on aspect ratio
                 height = int(width * aspect_ratio_values[1] / aspect_ratio_values[0])
+        return width, height
 
-        cache_key = f"w{width}h{height}{self.crop_mode}{self.aspect_ratio}"
-        if cache_key in self.current_media_cache:
-            return self.current_media_cache[cache_key]
-
-        if self.crop_mode == SETTING_CROP_MODE_COMBINED:
-            result = await self._get_combined_media_data(width, height)
+    async def _async_render_once(
+        self,
+        primary: MediaItem,
+        secondary: MediaItem | None,
+        width: int,
+        height: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Tuple[bytes | None, MediaItem | None]:
+        """Render media, joining a render of the same media and settings in progress.
+
+        Concurrent requests for the same image then decode it only once. Joining
+        a background render with interactive priority moves it up the queue.
+        """
+        key = self._render_cache_key(primary, secondary, width, height)
+        render = self._renders.get(key)
+        if render is None:
+            render = asyncio.create_task(
+                self._async_render(primary, secondary, width, height, priority)
+            )
+            self._renders[key] = render
+
+            def render_done(_) -> None:
+                if self._renders.get(key) is render:
+                    del self._renders[key]
+
+            render.add_done_callback(render_done)
+        elif priority == PRIORITY_INTERACTIVE:
+            # The render may have been started in the background by a prefetch
+            with self._photos_manager.render_backend.boost(self):
+                return await asyncio.shield(render)
+        # A caller giving up must not cancel the render the others wait for
+        return await asyncio.shield(render)
+
+    async def _async_render(
+        self,
+        primary: MediaItem,
+        secondary: MediaItem | None,
+        width: int,
+        height: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Tuple[bytes | None, MediaItem | None]:
+        """Render media with the current settings, storing it in the render cache.
+
+        Returns the image data and the secondary media it was combined with.
+        """
+        if self.crop_mode in SETTING_CROP_MODES_COMBINED:
+            result, secondary = await self._get_combined_media_data(
+                primary, secondary, width, height, priority
+            )
             if result is not None:
-                self.async_update_listeners()
-                self.current_media_cache[cache_key] = result
-                return self.current_media_cache[cache_key]
+                self.render_cache.put(
+                    self._render_cache_key(primary, secondary, width, height),
+                    result,
+                )
+                return result, secondary
         
         # Process the image from the local file
         try:
-            # Use async_add_executor_job for file operations
-            def read_and_process_image():
-                with open(self.current_media_primary.path, "rb") as f:
-                    image_data = f.read()
-                    
-                # Process the image with PIL to resize/crop as needed
-                with Image.open(io.BytesIO(image_data)) as img:
-                    # Apply EXIF orientation first
-                    img = self._apply_exif_orientation(img)
-                    
-                    # Get original dimensions (after orientation correction)
-                    original_width, original_height = img.size
-                    
-                    # Calculate new dimensions while maintaining aspect ratio
-                    if self.crop_mode == SETTING_CROP_MODE_CROP:
-                        # Crop mode - resize to fill the target dimensions, may crop parts of the image
-                        img_resized = self._resize_and_crop_image(img, width, height)
-                    elif self.crop_mode == SETTING_CROP_MODE_ORIGINAL:
-                        # Original mode - resize to fit within the target dimensions, may have letterboxing
-                        # If using original mode, we respect the original aspect ratio of the image
-                        img_resized = self._resize_to_fit(img, width, height)
-                    else:
-                        # For combined mode, we'll still use resize_and_crop_image to ensure proper filling
-                        img_resized = self._resize_and_crop_image(img, width, height)
-                    
-                    # Convert the resized image back to bytes
-                    img_byte_arr = io.BytesIO()
-                    # Preserve the original format if possible
-                    img_format = img.format if img.format else 'JPEG'
-                    img_resized.save(img_byte_arr, format=img_format, quality=95)
-                    return img_byte_arr.getvalue()
-            
-            # Run the file operations in a separate thread
-            result = await self.hass.async_add_executor_job(read_and_process_image)
-            self.current_media_cache[cache_key] = result
-            self.async_update_listeners()
-            return result
+            # Original mode fits the image within the target dimensions with
+            # letterboxing, crop and combined modes fill them and may crop
+            # parts of the image
+            job = self._render_job(
+                (
+                    RenderSource(
+                        primary.path,
+                        primary.mtime,
+                        (width, height),
+                        self.crop_mode != SETTING_CROP_MODE_ORIGINAL,
+                        (0, 0),
+                    ),
+                ),
+                None,
+            )
+            result = await self._async_render_job(job, priority)
+            self.render_cache.put(
+                self._render_cache_key(primary, None, width, height), result
+            )
+            return result, None
         except Exception as err:
-            _LOGGER.error("Error processing image %s: %s", self.current_media_primary.path, err)
-            return None
+            _LOGGER.error("Error processing image %s: %s", primary.path, err)
+            return None, None
 
-    async def _get_combined_media_data(self, width: int, height: int):
-        """Get a binary image data for the current media"""
+    def _render_cache_key(
+        self,
+        primary: MediaItem,
+        secondary: MediaItem | None,
+        width: int,
+        height: int,
+    ) -> Tuple:
+        """Key of media rendered with the current settings.
+
+        The mtime is included so changed files are rendered again.
+        """
+        return (
+            primary.id,
+            primary.mtime,
+            secondary.id if secondary is not None else None,
+            secondary.mtime if secondary is not None else None,
+            width,
+            height,
+            *self._render_settings(),
+        )
+
+    def _render_job(
+        self,
+        sources: Tuple[RenderSource, ...],
+        canvas_size: Tuple[int, int] | None,
+    ) -> RenderJob:
+        """Job rendering the sources with the current output settings"""
+        return RenderJob(
+            sources,
+            canvas_size,
+            SETTING_OUTPUT_FORMAT_MAP.get(self.output_format),
+            self.output_quality,
+        )
+
+    async def _async_render_job(
+        self, job: RenderJob, priority: int = PRIORITY_INTERACTIVE
+    ) -> bytes:
+        """Render a job, reusing the rendition stored on disk if there is one"""
+        rendition_cache = self._photos_manager.rendition_cache
+        rendition_key = None
+        if rendition_cache.enabled:
+
+            def get_cached_rendition():
+                key = rendition_cache.get_key(
+                    [source.path for source in job.sources], job
+                )
+                return key, rendition_cache.get(key)
+
+            rendition_key, cached = await self.hass.async_add_executor_job(
+                get_cached_rendition
+            )
+            if cached is not None:
+                return cached
+
+        result = await self._photos_manager.render_backend.async_render(
+            job, priority, self
+        )
+        if rendition_key is not None:
+            await self.hass.async_add_executor_job(
+                rendition_cache.put, rendition_key, result
+            )
+        return result
+
+    def _render_settings(self) -> Tuple:
+        """Settings changing how media is rendered, part of the cache keys."""
+        return (
+            self.crop_mode,
+            self.aspect_ratio,
+            self.output_format,
+            self.output_quality,
+        )
+
+    async def _get_combined_media_data(
+        self,
+        primary: MediaItem,
+        secondary: MediaItem | None,
+        width: int,
+        height: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Tuple[bytes | None, MediaItem | None]:
+        """Get a binary image data for the media combined with a secondary media"""
         requested_dimensions = (float(width), float(height))
-        media_dimensions = await self._get_media_dimensions()
+        media_dimensions = await self._get_media_dimensions(primary, priority)
         if media_dimensions is None:
-            return None
+            return None, secondary
             
         media_is_portrait = self._is_portrait(media_dimensions)
         if self._is_portrait(requested_dimensions) is media_is_portrait:
             # Requested orientation matches media orientation
-            return None
+            return None, secondary
 
         combined_image_dimensions = self._calculate_combined_image_dimensions(
             requested_dimensions, media_dimensions
@@ -392,107 +694,68 @@ class Coordinator(DataUpdateCoordinator):
         )
         if cut_loss_single < cut_loss_combined:
             # Bigger part of the image would be lost with combined images
-            return None
+            return None, secondary
 
-        if self.current_media_secondary is None:
+        if secondary is None:
             # Find another image with similar orientation
             try:
-                all_media = await self._photos_manager.get_media_items(self.album_id)
-                current_id = self.current_media_id()
-                
-                # Filter media with the same orientation
-                similar_orientation_media = []
-                for media_item in all_media:
-                    if media_item.id == current_id:
-                        continue
-                            
-                    # Get dimensions of this media item asynchronously
-                    try:
-                        # Define a function to run in the executor
-                        def get_item_dimensions(path):
-                            with Image.open(path) as img:
-                                return img.size
-                                
-                        # Run the file operation in a separate thread
-                        item_dimensions = await self.hass.async_add_executor_job(get_item_dimensions, media_item.path)
-                        is_portrait = self._is_portrait(item_dimensions)
-                        if is_portrait == media_is_portrait:
-                            similar_orientation_media.append(media_item)
-                    except Exception:
-                        continue
-                
-                if not similar_orientation_media:
-                    return None
-                    
-                # Choose a random media item with similar orientation
-                self.current_media_secondary = random.choice(similar_orientation_media)
+                if self.crop_mode == SETTING_CROP_MODE_COMBINED_BEST_FIT:
+                    # Pick one of the images losing the least when cropped to
+                    # its half of the combined image
+                    manager = self._photos_manager
+                    secondary = await manager.get_best_fit_media_item_with_orientation(
+                        self.album_id,
+                        media_is_portrait,
+                        combined_image_dimensions,
+                        COMBINED_BEST_FIT_CANDIDATES,
+                        self._calculate_cut_loss,
+                        primary.id,
+                    )
+                else:
+                    secondary = (
+                        await self._photos_manager.get_random_media_item_with_orientation(
+                            self.album_id, media_is_portrait, primary.id
+                        )
+                    )
             except Exception as err:
                 _LOGGER.error("Error finding secondary image: %s", err)
-                return None
+                return None, None
+            if secondary is None:
+                return None, None
 
         # Process both images
         try:
-            # Define a function to run in the executor
-            def process_combined_images():
-                # Load and resize primary image
-                with open(self.current_media_primary.path, "rb") as f:
-                    primary_data = f.read()
-                    
-                # Load and resize secondary image
-                with open(self.current_media_secondary.path, "rb") as f:
-                    secondary_data = f.read()
-                    
-                # Create the combined image
-                with Image.new("RGB", (width, height), "white") as output:
-                    # Process primary image
-                    with Image.open(io.BytesIO(primary_data)) as img1:
-                        # Apply EXIF orientation
-                        img1 = self._apply_exif_orientation(img1)
-                        
-                        # Get original dimensions
-                        orig_width, orig_height = img1.size
-                        
-                        # Calculate target dimensions while maintaining aspect ratio
-                        target_width = math.ceil(combined_image_dimensions[0])
-                        target_height = math.ceil(combined_image_dimensions[1])
-                        
-                        # Resize and crop to fit the combined dimensions (maintain aspect ratio)
-                        img1 = self._resize_and_crop_image(img1, target_width, target_height)
-                        output.paste(img1, (0, 0))
-                    
-                    # Process secondary image
-                    with Image.open(io.BytesIO(secondary_data)) as img2:
-                        # Apply EXIF orientation
-                        img2 = self._apply_exif_orientation(img2)
-                        
-                        # Get original dimensions
-                        orig_width, orig_height = img2.size
-                        
-                        # Calculate target dimensions while maintaining aspect ratio
-                        target_width = math.ceil(combined_image_dimensions[0])
-                        target_height = math.ceil(combined_image_dimensions[1])
-                        
-                        # Resize and crop to fit the combined dimensions (maintain aspect ratio)
-                        img2 = self._resize_and_crop_image(img2, target_width, target_height)
-                        
-                        # Position the second image
-                        if combined_image_dimensions[0] < requested_dimensions[0]:
-                            # Side by side
-                            output.paste(img2, (math.floor(combined_image_dimensions[0]), 0))
-                        else:
-                            # One above the other
-                            output.paste(img2, (0, math.floor(combined_image_dimensions[1])))
-                    
-                    # Save the combined image
-                    with io.BytesIO() as result:
-                        output.save(result, "JPEG")
-                        return result.getvalue()
-            
-            # Run the file operations in a separate thread
-            return await self.hass.async_add_executor_job(process_combined_images)
+            # Calculate target dimensions while maintaining aspect ratio
+            target_size = (
+                math.ceil(combined_image_dimensions[0]),
+                math.ceil(combined_image_dimensions[1]),
+            )
+            # Position the second image
+            if combined_image_dimensions[0] < requested_dimensions[0]:
+                # Side by side
+                secondary_position = (math.floor(combined_image_dimensions[0]), 0)
+            else:
+                # One above the other
+                secondary_position = (0, math.floor(combined_image_dimensions[1]))
+            # Both images are resized and cropped to fill the combined dimensions
+            job = self._render_job(
+                (
+                    RenderSource(primary.path, primary.mtime, target_size, True, (0, 0)),
+                    RenderSource(
+                        secondary.path,
+                        secondary.mtime,
+                        target_size,
+                        True,
+                        secondary_position,
+                    ),
+                ),
+                (width, height),
+            )
+            result = await self._async_render_job(job, priority)
+            return result, secondary
         except Exception as err:
             _LOGGER.error("Error creating combined image: %s", err)
-            return None
+            return None, secondary
 
     async def update_data(self):
         """Check if media list or current image needs to be refreshed"""
@@ -517,129 +780,28 @@ class Coordinator(DataUpdateCoordinator):
     def _calculate_cut_loss(
         self, target: Tuple[float, float], src: Tuple[float, float]
     ) -> float:
-        multiplier = max(target[0] / src[0], target[1] / src[1])
+        # Also used with arrays of widths and heights to compare many images
+        multiplier = np.maximum(target[0] / src[0], target[1] / src[1])
         return 1 - (
             (target[0] * target[1]) / ((src[0] * multiplier) * (src[1] * multiplier))
         )
         
-    def _resize_and_crop_image(self, img, target_width, target_height):
-        """Resize and crop the image to fill the target dimensions."""
-        # Apply EXIF orientation
-        img = self._apply_exif_orientation(img)
-        
-        # Get original dimensions
-        original_width, original_height = img.size
-        
-        # Calculate aspect ratios
-        original_ratio = original_width / original_height
-        target_ratio = target_width / target_height
-        
-        # Determine which dimension to fit
-        if original_ratio > target_ratio:  # Image is wider
-            # Resize to match target height, then crop width
-            resize_height = target_height
-            resize_width = int(original_width * (resize_height / original_height))
-            img_resized = img.resize((resize_width, resize_height), Image.LANCZOS)
-            
-            # Crop to target width
-            left = (resize_width - target_width) // 2
-            img_cropped = img_resized.crop((left, 0, left + target_width, target_height))
-            return img_cropped
-        else:  # Image is taller or same ratio
-            # Resize to match target width, then crop height
-            resize_width = target_width
-            resize_height = int(original_height * (resize_width / original_width))
-            img_resized = img.resize((resize_width, resize_height), Image.LANCZOS)
-            
-            # Crop to target height
-            top = (resize_height - target_height) // 2
-            img_cropped = img_resized.crop((0, top, target_width, top + target_height))
-            return img_cropped
-    
-    def _resize_to_fit(self, img, target_width, target_height):
-        """Resize the image to fit within the target dimensions while maintaining aspect ratio."""
-        # Apply EXIF orientation
-        img = self._apply_exif_orientation(img)
-        
-        # Get original dimensions
-        original_width, original_height = img.size
-        
-        # Calculate aspect ratios
-        original_ratio = original_width / original_height
-        target_ratio = target_width / target_height
-        
-        # Create a blank canvas with the target dimensions
-        canvas = Image.new('RGB', (target_width, target_height), (0, 0, 0))
-        
-        # Calculate new dimensions while maintaining aspect ratio
-        if original_ratio > target_ratio:  # Image is wider
-            # Fit to width
-            new_width = target_width
-            new_height = int(original_height * (new_width / original_width))
-        else:  # Image is taller or same ratio
-            # Fit to height
-            new_height = target_height
-            new_width = int(original_width * (new_height / original_height))
-        
-        # Resize the image
-        img_resized = img.resize((new_width, new_height), Image.LANCZOS)
-        
-        # Center the image on the canvas
-        paste_x = (target_width - new_width) // 2
-        paste_y = (target_height - new_height) // 2
-        canvas.paste(img_resized, (paste_x, paste_y))
-        
-        return canvas
-
-    def _apply_exif_orientation(self, img):
-        """Apply the EXIF orientation to the image."""
-        try:
-            # Check if the image has EXIF data
-            if hasattr(img, '_getexif') and img._getexif() is not None:
-                exif = dict(img._getexif().items())
-                orientation = exif.get(0x0112, 1)  # 0x0112 is the orientation tag
-                
-                # Apply the appropriate rotation/flip based on EXIF orientation
-                if orientation == 1:  # Normal
-                    return img
-                elif orientation == 2:  # Mirrored horizontally
-                    return img.transpose(Image.FLIP_LEFT_RIGHT)
-                elif orientation == 3:  # Rotated 180 degrees
-                    return img.transpose(Image.ROTATE_180)
-                elif orientation == 4:  # Mirrored vertically
-                    return img.transpose(Image.FLIP_TOP_BOTTOM)
-                elif orientation == 5:  # Mirrored horizontally and rotated 90 degrees counter-clockwise
-                    return img.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_90)
-                elif orientation == 6:  # Rotated 90 degrees counter-clockwise
-                    return img.transpose(Image.ROTATE_270)
-                elif orientation == 7:  # Mirrored horizontally and rotated 90 degrees clockwise
-                    return img.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_270)
-                elif orientation == 8:  # Rotated 90 degrees clockwise
-                    return img.transpose(Image.ROTATE_90)
-        except Exception as err:
-            _LOGGER.debug("Error applying EXIF orientation: %s", err)
-        
-        # Return the original image if there's no EXIF data or if there was an error
-        return img
     
     async def _get_media_dimensions(
-        self, media: MediaItem | None = None
+        self, media: MediaItem | None = None, priority: int = PRIORITY_INTERACTIVE
     ) -> Tuple[float, float] | None:
         """Get the dimensions of the media item"""
         media = media or self.current_media
         if media is None:
             return None
+        if media.dimensions is not None:
+            return media.dimensions
             
         try:
-            # Define a function to run in the executor
-            def get_dimensions():
-                with Image.open(media.path) as img:
-                    # Apply EXIF orientation to get the correct dimensions
-                    img = self._apply_exif_orientation(img)
-                    return img.size
-                    
-            # Run the file operation in a separate thread
-            return await self.hass.async_add_executor_job(get_dimensions)
+            # Run the file operation on a render thread
+            return await self._photos_manager.render_backend.async_run(
+                get_oriented_size, media.path, priority=priority, owner=self
+            )
         except Exception as err:
             _LOGGER.error("Error getting image dimensions for %s: %s", media.path, err)
             return None
@@ -0,0 +1,23 @@
+"""Diagnostics support for Local Photos."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import CoordinatorManager
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator_manager: CoordinatorManager = hass.data[DOMAIN][entry.entry_id][
+        "coordinator_manager"
+    ]
+    return {
+        "options": dict(entry.options),
+        **await coordinator_manager.async_get_diagnostics(),
+    }
@@ -0,0 +1,226 @@
+"""Live inotify watcher for the Local Photos folder."""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Constants from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+def _load_libc():
+    """Load libc with the inotify functions, None if not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FolderWatcher:
+    """Watches a directory tree with inotify.
+
+    Events are read on a dedicated thread and delivered on the event loop:
+    on_file_changed is called with the path of a file that was created, written,
+    moved or deleted, on_tree_changed when directories were added or removed or
+    events were lost, in which case the caller should rescan.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        root: str,
+        on_file_changed: Callable[[str], None],
+        on_tree_changed: Callable[[], None],
+    ) -> None:
+        """Initialize the folder watcher."""
+        self.hass = hass
+        self.root = root
+        self._on_file_changed = on_file_changed
+        self._on_tree_changed = on_tree_changed
+        self._libc = None
+        self._fd = -1
+        self._stop_read = -1
+        self._stop_write = -1
+        self._thread: Optional[threading.Thread] = None
+        self._paths: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+        self.complete = False
+
+    def start(self) -> bool:
+        """Start watching, returns False if inotify is not available.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        self._libc = _load_libc()
+        if self._libc is None:
+            _LOGGER.warning("Folder watcher requires inotify, which is not available")
+            return False
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            _LOGGER.warning(
+                "Could not initialize inotify: %s", os.strerror(ctypes.get_errno())
+            )
+            return False
+        self._stop_read, self._stop_write = os.pipe()
+        self.complete = self._add_tree(self.root)
+        self._thread = threading.Thread(
+            target=self._run, name=f"local_photos watcher {self.root}", daemon=True
+        )
+        self._thread.start()
+        _LOGGER.debug("Watching %d directories below %s", len(self._paths), self.root)
+        return True
+
+    def stop(self) -> None:
+        """Stop watching and wait for the reader thread to exit.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        if self._thread is not None:
+            os.write(self._stop_write, b"x")
+            self._thread.join()
+            self._thread = None
+        for fd in (self._fd, self._stop_read, self._stop_write):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._stop_read = self._stop_write = -1
+        self._paths.clear()
+        self._watches.clear()
+
+    def _add_tree(self, path: str) -> bool:
+        """Watch a directory and all directories below it, False if any failed."""
+        complete = True
+        for root, _, _ in os.walk(path):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    _LOGGER.warning(
+                        "Not enough inotify watches for %s, increase "
+                        "fs.inotify.max_user_watches. Changes will be picked up by "
+                        "periodic rescans instead",
+                        self.root,
+                    )
+                    return False
+                _LOGGER.debug("Could not watch %s: %s", root, os.strerror(err))
+                complete = False
+                continue
+            self._paths[wd] = root
+            self._watches[root] = wd
+        return complete
+
+    def _remove_tree(self, path: str) -> None:
+        """Stop watching a directory and all directories below it."""
+        prefix = path + os.sep
+        for watched in [p for p in self._watches if p == path or p.startswith(prefix)]:
+            wd = self._watches.pop(watched)
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _run(self) -> None:
+        """Read and dispatch events until stopped."""
+        while True:
+            readable, _, _ = select.select([self._fd, self._stop_read], [], [])
+            if self._stop_read in readable:
+                return
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except OSError as ex:
+                _LOGGER.error("Error reading inotify events: %s", ex)
+                return
+            try:
+                self._handle_events(data)
+            except Exception as ex:
+                _LOGGER.error("Error handling inotify events: %s", ex)
+                self._post(self._on_tree_changed)
+
+    def _handle_events(self, data: bytes) -> None:
+        """Parse a buffer of inotify events."""
+        tree_changed = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                _LOGGER.debug("Inotify queue overflow for %s", self.root)
+                tree_changed = True
+                continue
+            if mask & IN_IGNORED:
+                path = self._paths.pop(wd, None)
+                if path is not None and self._watches.get(path) == wd:
+                    self._watches.pop(path)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if not self._add_tree(path):
+                        self.complete = False
+                    tree_changed = True
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._remove_tree(path)
+                    tree_changed = True
+            elif mask & IN_DELETE_SELF:
+                if path == self.root:
+                    _LOGGER.warning("Watched folder %s was removed", self.root)
+                    tree_changed = True
+            elif name and mask & (
+                IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_ATTRIB
+            ):
+                # Newly created files are reported once they are closed
+                self._post(self._on_file_changed, path)
+
+        if tree_changed:
+            self._post(self._on_tree_changed)
+
+    def _post(self, target: Callable, *args) -> None:
+        """Call target on the event loop."""
+        self.hass.loop.call_soon_threadsafe(target, *args)
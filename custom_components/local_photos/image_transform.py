@@ -0,0 +1,299 @@
+"""Resizing, cropping and orienting images for Local Photos."""
+from __future__ import annotations
+
+import io
+import logging
+import math
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+_LOGGER = logging.getLogger(__name__)
+
+EXIF_ORIENTATION = 0x0112
+# Orientations where the stored image is rotated by 90 degrees
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+# Transpose operations undoing each EXIF orientation
+ORIENTATION_TRANSPOSES = {
+    2: (Image.FLIP_LEFT_RIGHT,),  # Mirrored horizontally
+    3: (Image.ROTATE_180,),  # Rotated 180 degrees
+    4: (Image.FLIP_TOP_BOTTOM,),  # Mirrored vertically
+    # Mirrored horizontally and rotated 90 degrees counter-clockwise
+    5: (Image.FLIP_LEFT_RIGHT, Image.ROTATE_90),
+    6: (Image.ROTATE_270,),  # Rotated 90 degrees counter-clockwise
+    # Mirrored horizontally and rotated 90 degrees clockwise
+    7: (Image.FLIP_LEFT_RIGHT, Image.ROTATE_270),
+    8: (Image.ROTATE_90,),  # Rotated 90 degrees clockwise
+}
+
+# Integer downscaling before the final resample keeps at least this many
+# source pixels per target pixel, see Image.resize
+REDUCING_GAP = 1.0
+# Grayscale modes with more than 8 bits per pixel, e.g. of 16 bit PNG files
+WIDE_GRAYSCALE_MODES = ("I", "I;16", "I;16B", "I;16L", "I;16N")
+
+# Encoder options next to the quality, by output format
+ENCODER_OPTIONS = {
+    "JPEG": {"optimize": True, "progressive": True},
+    "PNG": {},
+    "WEBP": {},
+    "AVIF": {},
+}
+
+CONTENT_TYPE_JPEG = "image/jpeg"
+
+
+class TransformPlan(NamedTuple):
+    """How to turn a stored image into the requested size.
+
+    box and size are in the stored orientation of the image, the image is only
+    transposed once it has been resized. With a canvas_size the resized image
+    is letterboxed on a black canvas at offset.
+    """
+
+    orientation: int
+    box: Tuple[float, float, float, float]
+    size: Tuple[int, int]
+    canvas_size: Optional[Tuple[int, int]]
+    offset: Tuple[int, int]
+
+
+def get_orientation(img: Image.Image) -> int:
+    """Return the EXIF orientation of an opened image, 1 if it has none."""
+    try:
+        return img.getexif().get(EXIF_ORIENTATION, 1)
+    except Exception as err:
+        _LOGGER.debug("Error reading EXIF orientation: %s", err)
+        return 1
+
+
+def get_oriented_size(path: str) -> Tuple[int, int]:
+    """Return the size of an image as displayed, reading only its header."""
+    with Image.open(path) as img:
+        width, height = img.size
+        if get_orientation(img) in ROTATED_ORIENTATIONS:
+            return height, width
+        return width, height
+
+
+def plan_transform(
+    source_size: Tuple[int, int],
+    orientation: int,
+    target_size: Tuple[int, int],
+    fill: bool,
+) -> TransformPlan:
+    """Plan resizing an image to the target size.
+
+    With fill the image covers the target and the overflow is cropped equally
+    on both sides, otherwise it fits within the target and is letterboxed.
+    """
+    source_width, source_height = source_size
+    target_width, target_height = target_size
+    if orientation in ROTATED_ORIENTATIONS:
+        # Center crops and scales do not depend on flips, only on the rotation
+        target_width, target_height = target_height, target_width
+
+    width_scale = target_width / source_width
+    height_scale = target_height / source_height
+    if fill:
+        scale = max(width_scale, height_scale)
+        box_width = target_width / scale
+        box_height = target_height / scale
+        left = (source_width - box_width) / 2
+        top = (source_height - box_height) / 2
+        return TransformPlan(
+            orientation,
+            (left, top, left + box_width, top + box_height),
+            (target_width, target_height),
+            None,
+            (0, 0),
+        )
+
+    if width_scale < height_scale:  # Image is wider
+        # Fit to width
+        size = (target_width, max(1, int(source_height * width_scale)))
+    else:  # Image is taller or same ratio
+        # Fit to height
+        size = (max(1, int(source_width * height_scale)), target_height)
+    displayed_size = size
+    if orientation in ROTATED_ORIENTATIONS:
+        displayed_size = (size[1], size[0])
+    canvas_size = tuple(target_size)
+    return TransformPlan(
+        orientation,
+        (0, 0, source_width, source_height),
+        size,
+        canvas_size,
+        (
+            (canvas_size[0] - displayed_size[0]) // 2,
+            (canvas_size[1] - displayed_size[1]) // 2,
+        ),
+    )
+
+
+def apply_transform(img: Image.Image, plan: TransformPlan) -> Image.Image:
+    """Resize, crop and orient an opened image according to plan."""
+    source_width, source_height = img.size
+    box = plan.box
+    box_width = box[2] - box[0]
+    box_height = box[3] - box[1]
+    if box_width > plan.size[0] and box_height > plan.size[1]:
+        # Let JPEG files decode at the smallest 1/2, 1/4 or 1/8 scale that
+        # still covers the target, other formats ignore this
+        img.draft(
+            None,
+            (
+                max(1, math.ceil(source_width * plan.size[0] / box_width)),
+                max(1, math.ceil(source_height * plan.size[1] / box_height)),
+            ),
+        )
+        if img.size != (source_width, source_height):
+            x_scale = img.width / source_width
+            y_scale = img.height / source_height
+            box = (box[0] * x_scale, box[1] * y_scale, box[2] * x_scale, box[3] * y_scale)
+
+    if img.mode in WIDE_GRAYSCALE_MODES:
+        # reduce() does not support 16 bit images and encoders would clip them,
+        # scale them to 8 bit grayscale first
+        img = img.convert("I").point(lambda value: value / 256).convert("L")
+    img = img.resize(plan.size, Image.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+    for method in ORIENTATION_TRANSPOSES.get(plan.orientation, ()):
+        img = img.transpose(method)
+
+    if plan.canvas_size is None:
+        return img
+    canvas = Image.new("RGB", plan.canvas_size, (0, 0, 0))
+    canvas.paste(img, plan.offset)
+    return canvas
+
+
+def transform_image(
+    image_data: bytes, target_size: Tuple[int, int], fill: bool
+) -> Tuple[Image.Image, Optional[str]]:
+    """Decode an image straight into the target size.
+
+    The plan is made from the header of the file, so the image is decoded only
+    once, at reduced scale where possible. Returns the image and the format of
+    the original file.
+    """
+    with Image.open(io.BytesIO(image_data)) as img:
+        plan = plan_transform(img.size, get_orientation(img), target_size, fill)
+        return apply_transform(img, plan), img.format
+
+
+class RenderSource(NamedTuple):
+    """An image file drawn into a rendered image."""
+
+    path: str
+    # Part of the job so it describes one version of the file
+    mtime: float
+    size: Tuple[int, int]
+    fill: bool
+    position: Tuple[int, int]
+
+
+class RenderJob(NamedTuple):
+    """Everything needed to render an image, small enough to send to a process.
+
+    A single source without canvas_size is encoded as is, otherwise all
+    sources are drawn on a white canvas.
+    """
+
+    sources: Tuple[RenderSource, ...]
+    canvas_size: Optional[Tuple[int, int]]
+    output_format: Optional[str]
+    quality: int
+
+
+def render_job(job: RenderJob) -> bytes:
+    """Render and encode an image.
+
+    This is a blocking function that runs in an executor thread or in a
+    render worker process.
+    """
+    if job.canvas_size is None:
+        source = job.sources[0]
+        with open(source.path, "rb") as file:
+            image_data = file.read()
+        img, source_format = transform_image(image_data, source.size, source.fill)
+        with img:
+            return encode_image(img, job.output_format, source_format, job.quality)
+
+    with Image.new("RGB", job.canvas_size, "white") as canvas:
+        for source in job.sources:
+            with open(source.path, "rb") as file:
+                image_data = file.read()
+            img, _ = transform_image(image_data, source.size, source.fill)
+            with img:
+                canvas.paste(img, source.position)
+        return encode_image(canvas, job.output_format, "JPEG", job.quality)
+
+
+def is_output_format_supported(output_format: str) -> bool:
+    """Return if this Pillow build can write the format, e.g. AVIF or WebP."""
+    Image.init()
+    return output_format in Image.SAVE
+
+
+def has_transparency(img: Image.Image) -> bool:
+    """Return if any pixel of the image is not fully opaque."""
+    if img.mode == "P":
+        if "transparency" not in img.info:
+            return False
+        img = img.convert("RGBA")
+    elif img.mode not in ("RGBA", "LA", "PA"):
+        return "transparency" in img.info
+    return img.getchannel("A").getextrema()[0] < 255
+
+
+def get_automatic_format(img: Image.Image, source_format: Optional[str]) -> str:
+    """Return the format to encode a rendered image in without a preference.
+
+    Opaque images are sent as JPEG, whatever the source format: a resized
+    screenshot as PNG is many times the size. Transparent images keep their
+    transparency as WebP or PNG.
+    """
+    if not has_transparency(img):
+        return "JPEG"
+    if source_format == "WEBP" and is_output_format_supported("WEBP"):
+        return "WEBP"
+    return "PNG"
+
+
+def encode_image(
+    img: Image.Image,
+    output_format: Optional[str],
+    source_format: Optional[str],
+    quality: int,
+) -> bytes:
+    """Encode a rendered image.
+
+    output_format is a Pillow format name, None or an unsupported format picks
+    one based on the image and the format of its source file.
+    """
+    if output_format is None or not is_output_format_supported(output_format):
+        output_format = get_automatic_format(img, source_format)
+    if output_format == "JPEG" and img.mode not in ("RGB", "L", "CMYK"):
+        img = img.convert("RGB")
+    with io.BytesIO() as buffer:
+        img.save(
+            buffer,
+            format=output_format,
+            quality=quality,
+            **ENCODER_OPTIONS.get(output_format, {}),
+        )
+        return buffer.getvalue()
+
+
+def get_content_type(data: bytes) -> str:
+    """Return the content type of an encoded image from its signature."""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    return CONTENT_TYPE_JPEG
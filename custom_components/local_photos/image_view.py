@@ -0,0 +1,111 @@
+"""HTTP view serving the current image of Local Photos cameras."""
+from __future__ import annotations
+
+from http import HTTPStatus
+import logging
+from typing import TYPE_CHECKING, Callable, Dict
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_IMAGE_VIEW
+from .image_transform import get_content_type
+
+if TYPE_CHECKING:
+    from .camera import LocalPhotosBaseCamera
+
+_LOGGER = logging.getLogger(__name__)
+
+IMAGE_VIEW_URL = "/api/local_photos/image/{entity_id}"
+# Clients may store the image but have to revalidate it, it can change any time
+CACHE_CONTROL = "private, no-cache"
+
+
+class LocalPhotosImageView(HomeAssistantView):
+    """Serves the current image of a camera with an ETag.
+
+    Dashboards polling the camera get a 304 Not Modified without any image
+    data as long as the image did not change. Like the camera proxy, requests
+    are authenticated or carry one of the access tokens of the camera.
+    """
+
+    url = IMAGE_VIEW_URL
+    name = "api:local_photos:image"
+    requires_auth = False
+
+    def __init__(self) -> None:
+        """Initialize the image view."""
+        self.cameras: Dict[str, LocalPhotosBaseCamera] = {}
+
+    @callback
+    def async_add_camera(self, camera: LocalPhotosBaseCamera) -> Callable[[], None]:
+        """Serve the images of a camera, returns a callback to stop serving them."""
+        entity_id = camera.entity_id
+        self.cameras[entity_id] = camera
+
+        @callback
+        def remove_camera() -> None:
+            if self.cameras.get(entity_id) is camera:
+                del self.cameras[entity_id]
+
+        return remove_camera
+
+    async def get(self, request: web.Request, entity_id: str) -> web.StreamResponse:
+        """Return the current image, or 304 if the client has it already."""
+        camera = self.cameras.get(entity_id)
+        if camera is None:
+            raise web.HTTPNotFound()
+        if not (
+            request[KEY_AUTHENTICATED]
+            or request.query.get("token") in camera.access_tokens
+        ):
+            raise web.HTTPUnauthorized()
+        try:
+            width = int(request.query["width"]) if "width" in request.query else None
+            height = (
+                int(request.query["height"]) if "height" in request.query else None
+            )
+        except ValueError as err:
+            raise web.HTTPBadRequest() from err
+
+        coordinator = camera.coordinator
+        await coordinator.refresh_current_image()
+        etag = coordinator.get_media_etag(width, height)
+        if etag is not None and request.if_none_match:
+            if any(tag.value in (etag, "*") for tag in request.if_none_match):
+                return web.Response(
+                    status=HTTPStatus.NOT_MODIFIED, headers=self._headers(etag)
+                )
+
+        media = coordinator.current_media
+        data = await coordinator.get_media_data(width, height)
+        if data is None:
+            _LOGGER.debug("No image available for %s", entity_id)
+            raise web.HTTPInternalServerError()
+        # The media may have changed while rendering, only tag what was rendered
+        etag = (
+            coordinator.get_media_etag(width, height)
+            if coordinator.current_media is media
+            else None
+        )
+        return web.Response(
+            body=data, content_type=get_content_type(data), headers=self._headers(etag)
+        )
+
+    @staticmethod
+    def _headers(etag: str | None) -> Dict[str, str]:
+        """Return the caching headers of a response."""
+        if etag is None:
+            return {hdrs.CACHE_CONTROL: "no-store"}
+        return {hdrs.ETAG: f'"{etag}"', hdrs.CACHE_CONTROL: CACHE_CONTROL}
+
+
+@callback
+def async_get_image_view(hass: HomeAssistant) -> LocalPhotosImageView:
+    """Get the image view, registering it on first use."""
+    view: LocalPhotosImageView | None = hass.data.get(DATA_IMAGE_VIEW)
+    if view is None:
+        view = hass.data[DATA_IMAGE_VIEW] = LocalPhotosImageView()
+        hass.http.register_view(view)
+    return view
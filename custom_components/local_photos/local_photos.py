@@ -1,23 +1,199 @@
 """Local Photos API for Home Assistant."""
 from __future__ import annotations
 
+import asyncio
+import bisect
+import hashlib
 import logging
 import os
 import random
-from datetime import datetime
-from typing import Dict, List, Optional
+import shutil
+import sys
+from datetime import datetime, timedelta, timezone
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from stat import S_ISREG
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 import mimetypes
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_ALBUM_ID_FAVORITES, CONF_FOLDER_PATH
+import numpy as np
+from PIL import Image
+
+from .const import (
+    CACHE_DIRECTORY,
+    CONF_ALBUM_ID_FAVORITES,
+    CONF_FOLDER_PATH,
+    CONF_RENDER_WORKERS,
+    CONF_RENDITION_CACHE_SIZE,
+    CONF_SCAN_WORKERS,
+    CONF_WATCH_FOLDER,
+    DATA_PHOTOS_MANAGERS,
+    DOMAIN,
+    FOLDER_OPTIONS,
+    LEGACY_CACHE_DIRECTORY,
+    MEDIA_INDEX_RESCAN_INTERVAL,
+    RENDER_WORKERS_DEFAULT_OPTION,
+    RENDITION_CACHE_SIZE_DEFAULT_OPTION,
+    SCAN_WORKERS_DEFAULT_OPTION,
+    SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+    SETTING_IMAGESELECTION_MODE_DATE_TAKEN,
+    SETTING_IMAGESELECTION_MODE_FILE_MODIFIED,
+    WATCH_FOLDER_DEFAULT_OPTION,
+)
+from .folder_watcher import FolderWatcher
+from .media_index import MediaIndex
+from .render_backend import RenderBackend
+from .rendition_cache import RenditionCache
 
 _LOGGER = logging.getLogger(__name__)
 
 # Supported image file extensions
 SUPPORTED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
 
+# EXIF orientation tag, values 5 to 8 are rotated by 90 degrees
+EXIF_ORIENTATION = 0x0112
+
+# Other EXIF tags read while indexing
+EXIF_MAKE = 0x010F
+EXIF_MODEL = 0x0110
+EXIF_DATETIME = 0x0132
+EXIF_IFD = 0x8769
+EXIF_GPS_IFD = 0x8825
+EXIF_EXPOSURE_TIME = 0x829A
+EXIF_F_NUMBER = 0x829D
+EXIF_ISO = 0x8827
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_OFFSET_TIME_ORIGINAL = 0x9011
+EXIF_FOCAL_LENGTH = 0x920A
+
+# Number of files read per executor job when indexing image headers
+IMAGE_INFO_BATCH_SIZE = 100
+
+
+class ExifInfo(NamedTuple):
+    """Camera metadata of an image, None for values not in its EXIF data."""
+
+    camera_make: str | None
+    camera_model: str | None
+    exposure_time: float | None
+    f_number: float | None
+    iso: int | None
+    focal_length: float | None
+    has_gps: bool
+
+
+class ImageInfo(NamedTuple):
+    """Everything indexed from the header of an image."""
+
+    width: int
+    height: int
+    orientation: int
+    taken: float | None
+    camera_make: str | None
+    camera_model: str | None
+    exposure_time: float | None
+    f_number: float | None
+    iso: int | None
+    focal_length: float | None
+    has_gps: bool
+
+    @property
+    def exif(self) -> ExifInfo | None:
+        """Camera metadata part of the info, None if the image has none."""
+        exif = ExifInfo(*self[4:])
+        return exif if any(exif) else None
+
+
+def read_image_info(path: str) -> ImageInfo:
+    """Read dimensions, orientation and EXIF metadata from the header of an image.
+
+    Returns 0x0 for files that can not be read. Pixel data is not decoded.
+    This is a synchronous method that should be called using async_add_executor_job
+    """
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            exif = img.getexif()
+    except Exception as ex:
+        _LOGGER.debug("Error reading header of %s: %s", path, ex)
+        return ImageInfo(0, 0, 1, None, None, None, None, None, None, None, False)
+    try:
+        exif_ifd = exif.get_ifd(EXIF_IFD)
+        return ImageInfo(
+            width,
+            height,
+            exif.get(EXIF_ORIENTATION, 1),
+            _exif_timestamp(
+                exif_ifd.get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME),
+                exif_ifd.get(EXIF_OFFSET_TIME_ORIGINAL),
+            ),
+            _exif_string(exif.get(EXIF_MAKE)),
+            _exif_string(exif.get(EXIF_MODEL)),
+            _exif_number(exif_ifd.get(EXIF_EXPOSURE_TIME)),
+            _exif_number(exif_ifd.get(EXIF_F_NUMBER)),
+            _exif_int(exif_ifd.get(EXIF_ISO)),
+            _exif_number(exif_ifd.get(EXIF_FOCAL_LENGTH)),
+            bool(exif.get_ifd(EXIF_GPS_IFD)),
+        )
+    except Exception as ex:
+        _LOGGER.debug("Error reading EXIF data of %s: %s", path, ex)
+        orientation = exif.get(EXIF_ORIENTATION, 1)
+        return ImageInfo(
+            width, height, orientation, None, None, None, None, None, None, None, False
+        )
+
+
+def _exif_timestamp(value, offset) -> float | None:
+    """Convert an EXIF date and time to a timestamp.
+
+    EXIF times are local times, without an offset they are taken to be in the
+    time zone of Home Assistant.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip("\0 ")
+    offset = offset.strip("\0 ") if isinstance(offset, str) else None
+    try:
+        if offset:
+            taken = datetime.strptime(f"{value} {offset}", "%Y:%m:%d %H:%M:%S %z")
+        else:
+            taken = datetime.strptime(value, "%Y:%m:%d %H:%M:%S").replace(
+                tzinfo=dt_util.get_default_time_zone()
+            )
+    except ValueError:
+        return None
+    return taken.timestamp()
+
+
+def _exif_string(value) -> str | None:
+    """Clean up an EXIF text value, interned as many images share it."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip("\0 ")
+    return sys.intern(value) if value else None
+
+
+def _exif_number(value) -> float | None:
+    """Convert an EXIF rational to a float."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return number if number == number else None
+
+
+def _exif_int(value) -> int | None:
+    """Convert an EXIF integer, which may be stored as a list of values."""
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    number = _exif_number(value)
+    return None if number is None else int(number)
+
+
 class Album:
     """Representation of a local photo album (folder)."""
 
@@ -45,46 +221,139 @@ class Album:
         return default
 
 
+class RescanResult(NamedTuple):
+    """Summary of the work done by a rescan of the photos directory."""
+
+    added: int
+    removed: int
+    modified: int
+    directories_listed: int
+
+
 class MediaItem:
-    """Representation of a local media item (photo)."""
+    """Representation of a local media item (photo).
+
+    Albums can hold hundreds of thousands of items, so items use __slots__ and
+    share one interned string for the directory of all files in a folder.
+    Creation time and metadata are only built when they are first used, from the
+    mtime found while scanning and the EXIF data indexed in the background, so
+    creating an item or showing its metadata does no I/O.
+    """
+
+    __slots__ = (
+        "id",
+        "filename",
+        "directory",
+        "mtime",
+        "width",
+        "height",
+        "orientation",
+        "taken",
+        "exif",
+        "_creation_time",
+        "_media_metadata",
+    )
 
-    def __init__(self, id: str, filename: str, path: str) -> None:
+    # Not available for local files
+    product_url = None
+    contributor_info = None
+
+    def __init__(
+        self,
+        id: str,
+        filename: str,
+        path: str,
+        mtime: float,
+        width: int | None = None,
+        height: int | None = None,
+        orientation: int | None = None,
+        taken: float | None = None,
+        exif: ExifInfo | None = None,
+    ) -> None:
         """Initialize a local media item."""
         self.id = id
         self.filename = filename
-        self.path = path
-        self.creation_time = self._get_creation_time()
-        self.media_metadata = self._get_media_metadata()
-        self.product_url = None
-        self.contributor_info = None
+        self.directory = sys.intern(os.path.dirname(path))
+        self.mtime = mtime
+        # Stored size of the image and its EXIF orientation, None until indexed
+        self.width = width
+        self.height = height
+        self.orientation = orientation
+        # Time the photo was taken according to EXIF and its camera metadata,
+        # None until indexed or if the image has no EXIF data
+        self.taken = taken
+        self.exif = exif
+        self._creation_time: datetime | None = None
+        self._media_metadata: Dict | None = None
+
+    def set_image_info(self, info: ImageInfo) -> None:
+        """Set the info read from the header of the image."""
+        self.width = info.width
+        self.height = info.height
+        self.orientation = info.orientation
+        self.taken = info.taken
+        self.exif = info.exif
+        self._creation_time = None
+        self._media_metadata = None
+
+    @property
+    def path(self) -> str:
+        """Full path of the media file."""
+        return os.path.join(self.directory, self.filename)
+
+    @property
+    def dimensions(self) -> Tuple[int, int] | None:
+        """Displayed dimensions with EXIF orientation applied, None if not known."""
+        if not self.width or not self.height:
+            return None
+        if self.orientation is not None and 5 <= self.orientation <= 8:
+            return (self.height, self.width)
+        return (self.width, self.height)
+
+    @property
+    def creation_time(self) -> datetime:
+        """Creation time of the media item."""
+        if self._creation_time is None:
+            self._creation_time = self._get_creation_time()
+        return self._creation_time
+
+    @property
+    def media_metadata(self) -> Dict:
+        """Metadata of the media item."""
+        if self._media_metadata is None:
+            self._media_metadata = self._get_media_metadata()
+        return self._media_metadata
 
     def _get_creation_time(self) -> datetime:
-        """Get creation time from file metadata."""
-        try:
-            stat = os.stat(self.path)
-            # Use the earliest time available (either creation or modification time)
-            ctime = datetime.fromtimestamp(stat.st_ctime)
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-            return min(ctime, mtime)
-        except Exception as ex:
-            _LOGGER.error("Error getting creation time for %s: %s", self.path, ex)
-            return datetime.now()
+        """Get creation time from EXIF, or the modification time found while scanning."""
+        timestamp = self.taken if self.taken is not None else self.mtime
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
     def _get_media_metadata(self) -> Dict:
-        """Get basic media metadata."""
-        # In a real implementation, we could use PIL or other libraries to extract EXIF data
-        # For now, we'll just provide basic file info
-        return {
-            "photo": {
-                "cameraMake": "Local Photos",
-                "cameraModel": "File System",
-                "focalLength": 0,
-                "apertureFNumber": 0,
-                "isoEquivalent": 0,
-                "exposureTime": "0s",
-            },
-            "creationTime": self.creation_time.isoformat(),
-        }
+        """Get media metadata in the format of the Google Photos API."""
+        metadata: Dict = {"creationTime": self.creation_time.isoformat()}
+        if self.width and self.height:
+            dimensions = self.dimensions
+            metadata["width"] = str(dimensions[0])
+            metadata["height"] = str(dimensions[1])
+        photo: Dict = {}
+        exif = self.exif
+        if exif is not None:
+            if exif.camera_make is not None:
+                photo["cameraMake"] = exif.camera_make
+            if exif.camera_model is not None:
+                photo["cameraModel"] = exif.camera_model
+            if exif.focal_length is not None:
+                photo["focalLength"] = exif.focal_length
+            if exif.f_number is not None:
+                photo["apertureFNumber"] = exif.f_number
+            if exif.iso is not None:
+                photo["isoEquivalent"] = exif.iso
+            if exif.exposure_time is not None:
+                photo["exposureTime"] = f"{exif.exposure_time:g}s"
+            metadata["hasLocation"] = exif.has_gps
+        metadata["photo"] = photo
+        return metadata
 
     def get(self, key, default=None):
         """Get media item attribute."""
@@ -101,6 +370,370 @@ class MediaItem:
         return default
 
 
+def _sort_key(item: MediaItem) -> Tuple[str, str]:
+    """Alphabetical sort key of a media item."""
+    return (item.filename.lower(), item.directory)
+
+
+def _date_taken_key(item: MediaItem) -> Tuple[float, str, str]:
+    """Date taken sort key, the modification time for items without EXIF date."""
+    taken = item.taken if item.taken is not None else item.mtime
+    return (taken, item.filename.lower(), item.directory)
+
+
+def _modified_key(item: MediaItem) -> Tuple[float, str, str]:
+    """File modified sort key of a media item."""
+    return (item.mtime, item.filename.lower(), item.directory)
+
+
+# Sort keys of the sequential selection modes
+SORT_KEYS: Dict[str, Callable] = {
+    SETTING_IMAGESELECTION_MODE_ALPHABETICAL: _sort_key,
+    SETTING_IMAGESELECTION_MODE_DATE_TAKEN: _date_taken_key,
+    SETTING_IMAGESELECTION_MODE_FILE_MODIFIED: _modified_key,
+}
+
+
+class MediaPool:
+    """Unordered set of media items supporting constant time random sampling.
+
+    The dimensions of the items are kept in an array in the same order, so the
+    best fits for a size can be found for all items at once.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the media pool."""
+        self.items: List[MediaItem] = []
+        self._positions: Dict[str, int] = {}
+        # Rows past len(items) are spare room for items added later
+        self._dimensions = np.empty((16, 2), dtype=np.float64)
+
+    def __len__(self) -> int:
+        """Return the number of media items."""
+        return len(self.items)
+
+    def add(self, media_item: MediaItem) -> None:
+        """Add a media item."""
+        position = self._positions.get(media_item.id)
+        if position is not None:
+            self.items[position] = media_item
+        else:
+            position = self._positions[media_item.id] = len(self.items)
+            self.items.append(media_item)
+            if position == len(self._dimensions):
+                self._dimensions = np.resize(self._dimensions, (position * 2, 2))
+        self._dimensions[position] = media_item.dimensions
+
+    def remove(self, media_id: str) -> None:
+        """Remove a media item by id, by moving the last item into its place."""
+        position = self._positions.pop(media_id, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self._positions[last.id] = position
+            self._dimensions[position] = self._dimensions[len(self.items)]
+
+    def sample(self, exclude_id: str | None = None) -> MediaItem | None:
+        """Get a random media item other than exclude_id, None if there is none."""
+        excluded = self._positions.get(exclude_id) if exclude_id else None
+        count = len(self.items) - (excluded is not None)
+        if count <= 0:
+            return None
+        position = random.randrange(count)
+        if excluded is not None and position >= excluded:
+            position += 1
+        return self.items[position]
+
+    def sample_best_fit(
+        self,
+        target: Tuple[float, float],
+        candidates: int,
+        cut_loss: Callable[[Tuple[float, float], Tuple[Any, Any]], Any],
+        exclude_id: str | None = None,
+    ) -> MediaItem | None:
+        """Get a random item from the ones losing the least area when cropped to target.
+
+        cut_loss is called once with the widths and heights of all items as arrays.
+        """
+        excluded = self._positions.get(exclude_id) if exclude_id else None
+        count = min(candidates, len(self.items) - (excluded is not None))
+        if count <= 0:
+            return None
+        dimensions = self._dimensions[: len(self.items)]
+        losses = cut_loss(target, (dimensions[:, 0], dimensions[:, 1]))
+        if excluded is not None:
+            losses[excluded] = np.inf
+        if count < len(losses):
+            best = np.argpartition(losses, count - 1)[:count]
+        else:
+            best = np.arange(len(losses))
+            best = best[best != excluded] if excluded is not None else best
+        return self.items[int(random.choice(best))]
+
+
+class SortedMedia:
+    """Media items kept in the order of a sort key, with a sequential cursor.
+
+    When the current item is removed the cursor continues with the item that
+    now follows its old sort position.
+    """
+
+    def __init__(self, media_items: List[MediaItem], key: Callable) -> None:
+        """Initialize the sorted media, sorting the list in place."""
+        media_items.sort(key=key)
+        self.items = media_items
+        self.key = key
+        self._positions: Dict[str, int] | None = None
+        # Id and sort key of the item last returned by next_item
+        self.cursor: Tuple[str, Tuple] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of media items."""
+        return len(self.items)
+
+    def get_position(self, media_id: str) -> int | None:
+        """Return the position of an item, the positions are rebuilt after changes."""
+        if self._positions is None:
+            self._positions = {item.id: i for i, item in enumerate(self.items)}
+        return self._positions.get(media_id)
+
+    def add(self, media_item: MediaItem) -> None:
+        """Insert a media item at its sort position."""
+        bisect.insort(self.items, media_item, key=self.key)
+        self._positions = None
+
+    def remove(self, media_item: MediaItem, key: Tuple | None = None) -> None:
+        """Remove a media item.
+
+        Pass the sort key the item had when it was added if it changed since.
+        """
+        item_key = self.key
+        if key is None:
+            key = item_key(media_item)
+        else:
+            # The item is still at the position of its old key
+            def item_key(item: MediaItem) -> Tuple:
+                return key if item is media_item else self.key(item)
+
+        position = bisect.bisect_left(self.items, key, key=item_key)
+        while position < len(self.items) and item_key(self.items[position]) == key:
+            if self.items[position] is media_item:
+                del self.items[position]
+                self._positions = None
+                return
+            position += 1
+        # Not at the position of its key, its key changed without being passed
+        for position, item in enumerate(self.items):
+            if item is media_item:
+                _LOGGER.debug("Removing %s out of sort order", media_item.path)
+                del self.items[position]
+                self._positions = None
+                return
+
+    def next_item(self, current_media_id: str | None) -> MediaItem | None:
+        """Get the item after the current one, looping back to the first."""
+        if not self.items:
+            return None
+        position = None
+        if current_media_id:
+            position = self.get_position(current_media_id)
+        if position is not None:
+            next_position = (position + 1) % len(self.items)
+        elif current_media_id and self.cursor and self.cursor[0] == current_media_id:
+            # The current item was removed, continue where it used to be
+            next_position = bisect.bisect_right(
+                self.items, self.cursor[1], key=self.key
+            ) % len(self.items)
+        else:
+            next_position = 0
+        media_item = self.items[next_position]
+        self.cursor = (media_item.id, self.key(media_item))
+        return media_item
+
+
+class AlbumMedia:
+    """Media items of an album in alphabetical order, indexed by id.
+
+    The items are also kept in date taken and file modified order. All orders
+    are sorted once when the album is loaded, in the executor, and updated with
+    bisect as files come and go, so selecting the next item never sorts.
+    Items with known dimensions are also kept in a portrait and a landscape pool.
+    """
+
+    def __init__(self, media_items: List[MediaItem]) -> None:
+        """Initialize the album media."""
+        self._orders: Dict[str, SortedMedia] = {
+            order: SortedMedia(list(media_items), key)
+            for order, key in SORT_KEYS.items()
+        }
+        self._alphabetical = self._orders[SETTING_IMAGESELECTION_MODE_ALPHABETICAL]
+        self.portrait = MediaPool()
+        self.landscape = MediaPool()
+        for media_item in media_items:
+            self._add_to_pool(media_item)
+
+    def __len__(self) -> int:
+        """Return the number of media items."""
+        return len(self._alphabetical)
+
+    @property
+    def items(self) -> List[MediaItem]:
+        """Media items in alphabetical order."""
+        return self._alphabetical.items
+
+    @property
+    def cursors(self) -> Dict[str, Tuple[str, Tuple]]:
+        """Cursors of all orders, to continue from after reloading the album."""
+        return {
+            order: sorted_media.cursor
+            for order, sorted_media in self._orders.items()
+            if sorted_media.cursor is not None
+        }
+
+    @cursors.setter
+    def cursors(self, cursors: Dict[str, Tuple[str, Tuple]]) -> None:
+        """Restore cursors saved from a previous load of the album."""
+        for order, cursor in cursors.items():
+            self._orders[order].cursor = cursor
+
+    def get(self, media_id: str) -> MediaItem | None:
+        """Get a media item by id."""
+        position = self._alphabetical.get_position(media_id)
+        if position is None:
+            return None
+        return self.items[position]
+
+    def _add_to_pool(self, media_item: MediaItem) -> None:
+        """Add a media item to the pool matching its orientation."""
+        dimensions = media_item.dimensions
+        if dimensions is None:
+            return
+        if dimensions[0] < dimensions[1]:
+            self.portrait.add(media_item)
+        else:
+            self.landscape.add(media_item)
+
+    def _remove_from_pools(self, media_id: str) -> None:
+        """Remove a media item from the orientation pools."""
+        self.portrait.remove(media_id)
+        self.landscape.remove(media_id)
+
+    def update_image_info(
+        self, media_item: MediaItem, previous_taken: float | None
+    ) -> None:
+        """Move an item to its new pool and date position after its info was read."""
+        if self.get(media_item.id) is not media_item:
+            return
+        self._remove_from_pools(media_item.id)
+        self._add_to_pool(media_item)
+        if previous_taken != media_item.taken:
+            date_taken = self._orders[SETTING_IMAGESELECTION_MODE_DATE_TAKEN]
+            previous_key = (
+                previous_taken if previous_taken is not None else media_item.mtime,
+                *_sort_key(media_item),
+            )
+            date_taken.remove(media_item, previous_key)
+            date_taken.add(media_item)
+
+    def add(self, media_item: MediaItem) -> None:
+        """Add a media item, replacing an item for the same file."""
+        self.remove(media_item.directory, media_item.filename)
+        for sorted_media in self._orders.values():
+            sorted_media.add(media_item)
+        self._add_to_pool(media_item)
+
+    def remove(self, directory: str, filename: str) -> None:
+        """Remove the media item of a file, if present."""
+        key = (filename.lower(), directory)
+        items = self.items
+        position = bisect.bisect_left(items, key, key=_sort_key)
+        while position < len(items) and _sort_key(items[position]) == key:
+            media_item = items[position]
+            if media_item.filename == filename:
+                self._remove_from_pools(media_item.id)
+                for sorted_media in self._orders.values():
+                    sorted_media.remove(media_item)
+                return
+            position += 1
+
+    def next_item(
+        self,
+        current_media_id: str | None,
+        order: str = SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+    ) -> MediaItem | None:
+        """Get the item after the current one in a sort order."""
+        return self._orders[order].next_item(current_media_id)
+
+
+def get_photos_dir(hass: HomeAssistant, config: ConfigType) -> str:
+    """Get the photos directory for a config entry."""
+    # Use the user-specified folder path if provided, otherwise use the default
+    folder_path = config.get(CONF_FOLDER_PATH)
+    if folder_path:
+        # If the path is not absolute, make it relative to the config directory
+        if not os.path.isabs(folder_path):
+            folder_path = os.path.join(hass.config.config_dir, folder_path)
+        return folder_path
+    # Fallback to the default path
+    return os.path.join(hass.config.config_dir, "www", "photos")
+
+
+def get_folder_options(config: ConfigType) -> Dict[str, Any]:
+    """Get the options of the photos manager for a config entry."""
+    return {key: config.get(key, default) for key, default in FOLDER_OPTIONS.items()}
+
+
+async def async_get_photos_manager(
+    hass: HomeAssistant, config: ConfigType
+) -> LocalPhotosManager:
+    """Get the manager for a photos directory.
+
+    Every config entry holds a single album, so entries for the same photos
+    directory share one manager and its scans. An entry with different folder
+    options gets a new manager, entries still using the old one keep it until
+    they are reloaded with the new options. Release the manager with
+    async_release_photos_manager.
+    """
+    managers: Dict[str, LocalPhotosManager] = hass.data.setdefault(
+        DATA_PHOTOS_MANAGERS, {}
+    )
+    photos_dir = get_photos_dir(hass, config)
+    manager = managers.get(photos_dir)
+    if manager is not None and manager.folder_options != get_folder_options(config):
+        _LOGGER.debug("Folder options of %s changed, starting a new manager", photos_dir)
+        manager = None
+    if manager is None:
+        manager = LocalPhotosManager(hass, config)
+        manager._setup_task = hass.async_create_task(manager.scan_albums())
+        managers[photos_dir] = manager
+    try:
+        # Other entries may be waiting for the same scan
+        await asyncio.shield(manager._setup_task)
+    except Exception:
+        # Do not keep a failed manager around, the next setup starts over
+        if managers.get(photos_dir) is manager:
+            del managers[photos_dir]
+            await manager.async_close()
+        raise
+    manager._users += 1
+    return manager
+
+
+async def async_release_photos_manager(
+    hass: HomeAssistant, manager: LocalPhotosManager
+) -> None:
+    """Release a manager, closing it when no config entry uses it anymore."""
+    manager._users -= 1
+    if manager._users > 0:
+        return
+    managers = hass.data.get(DATA_PHOTOS_MANAGERS, {})
+    if managers.get(manager.photos_dir) is manager:
+        del managers[manager.photos_dir]
+    await manager.async_close()
+
+
 class LocalPhotosManager:
     """Manager for local photos."""
 
@@ -108,19 +741,48 @@ class LocalPhotosManager:
         """Initialize the local photos manager."""
         self.hass = hass
         self.config = config
-        
-        # Use the user-specified folder path if provided, otherwise use the default
-        folder_path = config.get(CONF_FOLDER_PATH)
-        if folder_path:
-            # If the path is not absolute, make it relative to the config directory
-            if not os.path.isabs(folder_path):
-                folder_path = os.path.join(hass.config.config_dir, folder_path)
-            self.photos_dir = folder_path
-        else:
-            # Fallback to the default path
-            self.photos_dir = os.path.join(hass.config.config_dir, "www", "photos")
-            
+        self.photos_dir = get_photos_dir(hass, config)
+        self.folder_options = get_folder_options(config)
         self.albums = {}
+        self._users = 0
+        self._setup_task: asyncio.Task | None = None
+
+        # Persistent index of all media files, one database per photos directory
+        index_name = hashlib.sha1(self.photos_dir.encode()).hexdigest()[:12]
+        cache_dir = hass.config.path(CACHE_DIRECTORY, DOMAIN)
+        self._index = MediaIndex(os.path.join(cache_dir, f"media_index_{index_name}.db"))
+        self._index_generation = 0
+        # Resized and cropped images, shared by the coordinators of all albums
+        cache_size = config.get(
+            CONF_RENDITION_CACHE_SIZE, RENDITION_CACHE_SIZE_DEFAULT_OPTION
+        )
+        self.rendition_cache = RenditionCache(
+            os.path.join(cache_dir, f"renditions_{index_name}"),
+            int(cache_size) * 1024 * 1024,
+        )
+        self.render_backend = RenderBackend(
+            hass, int(config.get(CONF_RENDER_WORKERS, RENDER_WORKERS_DEFAULT_OPTION))
+        )
+        # Media of every directory, shared by all albums. Directories changed
+        # since loading are reloaded from the index when an album is built
+        self._tree: Dict[str, List[MediaItem]] | None = None
+        self._stale_dirs: Set[str] = set()
+        # Number of album media lists being loaded from the index, image info
+        # read meanwhile is kept and applied once they are done
+        self._album_loads = 0
+        self._pending_image_info: List[Tuple] = []
+        self._tree_lock = asyncio.Lock()
+        self._album_media: Dict[str, AlbumMedia] = {}
+        self._album_cursors: Dict[str, Dict[str, Tuple[str, Tuple]]] = {}
+        self._last_scan: datetime | None = None
+        self._scan_lock = asyncio.Lock()
+        self._top_level_directories: List[str] = []
+        self._rescan_requested = False
+        self._watcher: FolderWatcher | None = None
+        self._image_info_task: asyncio.Task | None = None
+        self._scan_workers = max(
+            1, int(config.get(CONF_SCAN_WORKERS, SCAN_WORKERS_DEFAULT_OPTION))
+        )
 
     async def scan_albums(self) -> None:
         """Scan for local photo albums (folders)."""
@@ -139,22 +801,527 @@ class LocalPhotosManager:
         self.albums[all_album.id] = all_album
 
         # Scan for subdirectories to use as albums
+        def list_subdirectories():
+            with os.scandir(self.photos_dir) as entries:
+                return [entry.name for entry in entries if entry.is_dir()]
+
         try:
-            dir_items = await self.hass.async_add_executor_job(os.listdir, self.photos_dir)
+            dir_items = await self.hass.async_add_executor_job(list_subdirectories)
             for item in dir_items:
                 item_path = os.path.join(self.photos_dir, item)
-                is_dir = await self.hass.async_add_executor_job(os.path.isdir, item_path)
-                if is_dir:
-                    album = Album(
-                        id=item,
-                        title=item,
-                        path=item_path
-                    )
-                    self.albums[album.id] = album
-                    _LOGGER.debug("Found album: %s at %s", album.title, album.path)
+                album = Album(
+                    id=item,
+                    title=item,
+                    path=item_path
+                )
+                self.albums[album.id] = album
+                _LOGGER.debug("Found album: %s at %s", album.title, album.path)
         except Exception as ex:
             _LOGGER.error("Error scanning for albums: %s", ex)
 
+        await self.hass.async_add_executor_job(self._move_legacy_cache)
+        await self.hass.async_add_executor_job(self._index.open)
+        try:
+            await self.hass.async_add_executor_job(self.rendition_cache.load)
+        except OSError as ex:
+            _LOGGER.error("Error loading rendition cache: %s", ex)
+        if self.config.get(CONF_WATCH_FOLDER, WATCH_FOLDER_DEFAULT_OPTION):
+            await self._async_start_watcher()
+
+        indexed = await self.hass.async_add_executor_job(self._index.count)
+        if indexed == 0:
+            # Nothing to show without an index, build it before continuing
+            await self.async_rescan()
+        else:
+            # Serve from the existing index, pick up changes in the background
+            self._async_request_rescan()
+            self._async_schedule_image_info()
+
+    def _move_legacy_cache(self) -> None:
+        """Move the index and resized images of earlier versions out of .storage.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        legacy_dir = self.hass.config.path(LEGACY_CACHE_DIRECTORY, DOMAIN)
+        if not os.path.isdir(legacy_dir):
+            return
+        paths = [
+            self._index.db_path + suffix for suffix in ("", "-journal", "-wal", "-shm")
+        ]
+        paths.append(self.rendition_cache.directory)
+        for path in paths:
+            legacy_path = os.path.join(legacy_dir, os.path.basename(path))
+            if not os.path.lexists(legacy_path):
+                continue
+            try:
+                if os.path.lexists(path):
+                    # Already moved, what is left in .storage is out of date
+                    if os.path.isdir(legacy_path):
+                        shutil.rmtree(legacy_path)
+                    else:
+                        os.unlink(legacy_path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    shutil.move(legacy_path, path)
+            except OSError as ex:
+                _LOGGER.warning("Error moving %s to %s: %s", legacy_path, path, ex)
+        try:
+            # Only succeeds once the files of all photos directories are moved
+            os.rmdir(legacy_dir)
+        except OSError:
+            pass
+
+    async def async_close(self) -> None:
+        """Stop the folder watcher and render workers and close the media index."""
+        if self._image_info_task is not None:
+            self._image_info_task.cancel()
+            self._image_info_task = None
+        if self._watcher is not None:
+            await self.hass.async_add_executor_job(self._watcher.stop)
+            self._watcher = None
+        await self.render_backend.async_shutdown()
+        await self.hass.async_add_executor_job(self._index.close)
+
+    async def _async_start_watcher(self) -> None:
+        """Start following changes below the photos directory with inotify."""
+        watcher = FolderWatcher(
+            self.hass,
+            self.photos_dir,
+            self._async_file_changed,
+            self._async_request_rescan,
+        )
+        if await self.hass.async_add_executor_job(watcher.start):
+            self._watcher = watcher
+
+    async def async_rescan(self) -> RescanResult:
+        """Update the media index with the changes below the photos directory."""
+        async with self._scan_lock:
+            self._last_scan = datetime.now()
+            try:
+                (
+                    result,
+                    upserted_media,
+                    removed_media,
+                    removed_dirs,
+                ) = await self.hass.async_add_executor_job(self._scan_changes)
+            except Exception as ex:
+                _LOGGER.error("Error scanning %s: %s", self.photos_dir, ex)
+                return RescanResult(0, 0, 0, 0)
+            _LOGGER.debug(
+                "Rescanned %s: %d added, %d removed, %d modified, %d directories listed",
+                self.photos_dir,
+                result.added,
+                result.removed,
+                result.modified,
+                result.directories_listed,
+            )
+            self._update_albums()
+            if upserted_media or removed_media or removed_dirs:
+                # Discard lists that are being loaded, they may not include the changes
+                self._index_generation += 1
+                async with self._tree_lock:
+                    if self._tree is not None:
+                        if removed_dirs:
+                            for directory in removed_dirs:
+                                self._tree.pop(directory, None)
+                            self._invalidate_albums(removed_dirs)
+                        self._apply_media_changes(upserted_media, removed_media)
+                self._async_schedule_image_info()
+            return result
+
+    def _apply_media_changes(
+        self, upserted_media: List[Tuple], removed_media: List[str]
+    ) -> None:
+        """Update the loaded directories and albums with files found by a rescan.
+
+        Added and modified files get new media items without image info, they
+        are moved to their place by date taken once it has been read.
+        """
+        changes: Dict[str, Dict[str, MediaItem | None]] = {}
+        for path in removed_media:
+            directory, filename = os.path.split(path)
+            changes.setdefault(directory, {})[filename] = None
+        for path, directory, filename, _, mtime in upserted_media:
+            changes.setdefault(directory, {})[filename] = MediaItem(
+                id=self._media_id(path), filename=filename, path=path, mtime=mtime
+            )
+
+        for directory, files in changes.items():
+            media_items = [
+                item for item in self._tree.get(directory, ()) if item.filename not in files
+            ]
+            media_items.extend(item for item in files.values() if item is not None)
+            if media_items:
+                self._tree[directory] = media_items
+            else:
+                self._tree.pop(directory, None)
+            for album_media in self._albums_media_of(directory):
+                for filename, media_item in files.items():
+                    if media_item is None:
+                        album_media.remove(directory, filename)
+                    else:
+                        album_media.add(media_item)
+
+        for album_id, album_media in self._album_media.items():
+            self.albums[album_id].media_items_count = len(album_media)
+
+    def _async_schedule_rescan(self) -> None:
+        """Start a background rescan if the index has not been refreshed recently."""
+        if self._watcher is not None and self._watcher.complete:
+            # All changes are reported by the folder watcher
+            return
+        if self._scan_lock.locked():
+            return
+        if self._last_scan is not None and datetime.now() - self._last_scan < timedelta(
+            seconds=MEDIA_INDEX_RESCAN_INTERVAL
+        ):
+            return
+        self._last_scan = datetime.now()
+        self.hass.async_create_background_task(
+            self.async_rescan(), f"{DOMAIN} rescan {self.photos_dir}"
+        )
+
+    @callback
+    def _async_request_rescan(self) -> None:
+        """Rescan as soon as possible, requests made in quick succession are combined."""
+        if self._rescan_requested:
+            return
+        self._rescan_requested = True
+        self.hass.async_create_background_task(
+            self._async_requested_rescan(), f"{DOMAIN} rescan {self.photos_dir}"
+        )
+
+    async def _async_requested_rescan(self) -> None:
+        """Run a requested rescan after a short delay."""
+        await asyncio.sleep(1)
+        self._rescan_requested = False
+        await self.async_rescan()
+
+    @callback
+    def _async_file_changed(self, path: str) -> None:
+        """Handle a file created, modified or removed below the photos directory."""
+        self.hass.async_create_background_task(
+            self._async_update_media_file(path), f"{DOMAIN} update {path}"
+        )
+
+    async def _async_update_media_file(self, path: str) -> None:
+        """Update the index and the cached albums for a single file."""
+        async with self._scan_lock:
+            try:
+                media_item, info, size, mtime = await self.hass.async_add_executor_job(
+                    self._load_media_file, path
+                )
+                directory = os.path.dirname(path)
+                if media_item is None:
+                    await self.hass.async_add_executor_job(
+                        self._index.apply_changes, (), [path]
+                    )
+                else:
+                    await self.hass.async_add_executor_job(
+                        self._index.apply_changes,
+                        [(path, directory, media_item.filename, size, mtime)],
+                    )
+                    await self.hass.async_add_executor_job(
+                        self._index.set_image_info, [(*info, path, mtime)]
+                    )
+            except Exception as ex:
+                _LOGGER.error("Error updating media file %s: %s", path, ex)
+                return
+
+            # Discard lists that are being loaded, they may not include this change
+            self._index_generation += 1
+            self._stale_dirs.add(directory)
+            all_album_id = self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL")
+            for album_id, album in self.albums.items():
+                if album_id != all_album_id and album.path != directory:
+                    continue
+                album_media = self._album_media.get(album_id)
+                if album_media is None:
+                    continue
+                if media_item is None:
+                    album_media.remove(directory, os.path.basename(path))
+                else:
+                    album_media.add(media_item)
+                album.media_items_count = len(album_media)
+
+    def _load_media_file(
+        self, path: str
+    ) -> Tuple[MediaItem | None, ImageInfo | None, int, float]:
+        """Create the media item for a single file, None if it is not a valid image.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        filename = os.path.basename(path)
+        if not self._has_supported_extension(filename):
+            return None, None, 0, 0
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None, 0, 0
+        if not S_ISREG(stat.st_mode) or not self._is_valid_image(path, stat.st_size):
+            return None, None, 0, 0
+        info = read_image_info(path)
+        media_item = MediaItem(
+            id=self._media_id(path),
+            filename=filename,
+            path=path,
+            mtime=stat.st_mtime,
+        )
+        media_item.set_image_info(info)
+        return media_item, info, stat.st_size, stat.st_mtime
+
+    @callback
+    def _async_schedule_image_info(self) -> None:
+        """Start reading missing image info in the background."""
+        if self._image_info_task is not None and not self._image_info_task.done():
+            return
+        self._image_info_task = self.hass.async_create_background_task(
+            self._async_read_image_info(), f"{DOMAIN} image info {self.photos_dir}"
+        )
+
+    async def _async_read_image_info(self) -> None:
+        """Read and store the image info of all files that do not have it yet.
+
+        Files are read in batches, only their headers are parsed. The info is
+        cleared by the index when a file changes, so only new and changed files
+        are read.
+        """
+        try:
+            while True:
+                missing = await self.hass.async_add_executor_job(
+                    self._index.get_missing_image_info, IMAGE_INFO_BATCH_SIZE
+                )
+                if not missing:
+                    return
+                # Header reads wait behind images requested by dashboards
+                rows = await self.render_backend.async_run(
+                    self._read_image_info, missing
+                )
+                await self.hass.async_add_executor_job(self._index.set_image_info, rows)
+                self._update_image_info(rows)
+        except Exception as ex:
+            _LOGGER.error("Error reading image info: %s", ex)
+
+    def _read_image_info(
+        self, files: List[Tuple[str, float]]
+    ) -> List[Tuple[ImageInfo, str, float]]:
+        """Read the image info of a batch of (path, mtime).
+
+        This is a synchronous method that should be called using render_backend.async_run
+        """
+        return [(*read_image_info(path), path, mtime) for path, mtime in files]
+
+    def _update_image_info(self, rows: List[Tuple]) -> None:
+        """Set read image info on the loaded media items."""
+        if self._album_loads:
+            # Lists being loaded may have read the index before this info was
+            # stored, and are sorted by the dates it changes. Update them once
+            # they are done
+            self._pending_image_info.extend(rows)
+            return
+        if self._tree is None:
+            return
+        by_directory: Dict[str, Dict[str, MediaItem]] = {}
+        for row in rows:
+            path, mtime = row[-2:]
+            directory, filename = os.path.split(path)
+            if directory not in by_directory:
+                by_directory[directory] = {
+                    item.filename: item for item in self._tree.get(directory, ())
+                }
+            media_item = by_directory[directory].get(filename)
+            if media_item is not None and media_item.mtime == mtime:
+                previous_taken = media_item.taken
+                media_item.set_image_info(ImageInfo(*row[:-2]))
+                for album_media in self._albums_media_of(directory):
+                    album_media.update_image_info(media_item, previous_taken)
+
+    def _albums_media_of(self, directory: str) -> List[AlbumMedia]:
+        """Get the loaded media of the albums that include a directory."""
+        all_album_id = self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL")
+        return [
+            album_media
+            for album_id, album_media in self._album_media.items()
+            if album_id == all_album_id or self.albums[album_id].path == directory
+        ]
+
+    def _invalidate_albums(self, changed_dirs: Set[str]) -> None:
+        """Drop the cached media lists of albums affected by changed directories."""
+        all_album_id = self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL")
+        for album_id, album in self.albums.items():
+            if album_id == all_album_id or album.path in changed_dirs:
+                album_media = self._album_media.pop(album_id, None)
+                if album_media is not None and album_media.cursors:
+                    # Keep the positions for sequential selection after reloading
+                    self._album_cursors[album_id] = album_media.cursors
+
+    def _update_albums(self) -> None:
+        """Add albums for top level directories that appeared since scan_albums."""
+        if not self.albums:
+            return
+        all_album_id = self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL")
+        known_paths = {album.path for album in self.albums.values()}
+        for path in self._top_level_directories:
+            item = os.path.basename(path)
+            if path in known_paths or item == all_album_id:
+                continue
+            album = Album(id=item, title=item, path=path)
+            self.albums[album.id] = album
+            _LOGGER.debug("Found album: %s at %s", album.title, album.path)
+
+    def _scan_changes(
+        self,
+    ) -> Tuple[RescanResult, List[Tuple], List[str], Set[str]]:
+        """Find and index the changes below the photos directory.
+
+        Returns a summary, the (path, directory, filename, size, mtime) of added
+        and modified files, the paths of removed files and the removed
+        directories that had files.
+
+        Directories whose mtime did not change since the last scan are not listed
+        again, their subdirectories are taken from the index instead. Adding,
+        removing or renaming an entry changes the mtime of its directory, so only
+        directories with such changes are listed. Files that are modified in place
+        are picked up the next time their directory is listed.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        known_dirs = self._index.get_directories()
+        children: Dict[str, List[str]] = {}
+        for path, (parent, _) in known_dirs.items():
+            children.setdefault(parent, []).append(path)
+
+        upserted_media = []
+        removed_media = []
+        upserted_dirs = []
+        seen_dirs = set()
+        added = removed = modified = listed = 0
+        scan_time = time.time()
+
+        # Directories are stat'ed and listed on a pool of workers, which matters
+        # on network shares where every call waits for a round trip
+        with ThreadPoolExecutor(
+            max_workers=self._scan_workers, thread_name_prefix=f"{DOMAIN}_scan"
+        ) as pool:
+
+            def submit(directory: str) -> Future:
+                known_dir = known_dirs.get(directory)
+                known_mtime = None if known_dir is None else known_dir[1]
+                return pool.submit(self._visit_directory, directory, known_mtime)
+
+            pending = {submit(self.photos_dir): self.photos_dir}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    dir_mtime, listing = future.result()
+                    if dir_mtime is None:
+                        continue
+                    seen_dirs.add(directory)
+
+                    if listing is None:
+                        for subdir in children.get(directory, []):
+                            pending[submit(subdir)] = subdir
+                        continue
+
+                    listed += 1
+                    subdirs, files = listing
+                    for subdir in subdirs:
+                        pending[submit(subdir)] = subdir
+                    if directory == self.photos_dir:
+                        self._top_level_directories = subdirs
+
+                    indexed = {
+                        path: (size, mtime)
+                        for path, _, _, size, mtime, *_ in self._index.get_media(
+                            directory
+                        )
+                    }
+                    for path, (filename, size, mtime) in files.items():
+                        previous = indexed.pop(path, None)
+                        if previous is None:
+                            added += 1
+                        elif previous != (size, mtime):
+                            modified += 1
+                        else:
+                            continue
+                        upserted_media.append((path, directory, filename, size, mtime))
+                    if indexed:
+                        removed += len(indexed)
+                        removed_media.extend(indexed)
+
+                    # A directory changed within the mtime resolution of this scan
+                    # could change again without a new mtime, list it next time too
+                    if scan_time - dir_mtime < 2:
+                        dir_mtime = None
+                    parent = (
+                        None if directory == self.photos_dir else os.path.dirname(directory)
+                    )
+                    upserted_dirs.append((directory, parent, dir_mtime))
+
+        removed_dirs = [path for path in known_dirs if path not in seen_dirs]
+        removed_media_dirs = set()
+        for path in removed_dirs:
+            count = len(self._index.get_media(path))
+            if count:
+                removed += count
+                removed_media_dirs.add(path)
+
+        self._index.apply_changes(
+            upserted_media, removed_media, upserted_dirs, removed_dirs
+        )
+        return (
+            RescanResult(added, removed, modified, listed),
+            upserted_media,
+            removed_media,
+            removed_media_dirs,
+        )
+
+    def _visit_directory(
+        self, directory: str, known_mtime: float | None
+    ) -> Tuple[float | None, Tuple[List[str], Dict[str, Tuple[str, int, float]]] | None]:
+        """Stat a directory and list it if its mtime differs from the known mtime.
+
+        Returns the mtime, None if the directory is gone, and the listing, None if
+        the directory did not change.
+        """
+        try:
+            dir_mtime = os.stat(directory).st_mtime
+        except OSError:
+            return None, None
+        if dir_mtime == known_mtime:
+            return dir_mtime, None
+        return dir_mtime, self._list_directory(directory)
+
+    def _list_directory(
+        self, directory: str
+    ) -> Tuple[List[str], Dict[str, Tuple[str, int, float]]]:
+        """List subdirectories and valid images, as {path: (filename, size, mtime)}.
+
+        Uses the type information returned with the directory listing and stats
+        only files with a supported extension, once.
+
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        subdirs = []
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                        elif self._has_supported_extension(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            if self._is_valid_image(entry.path, stat.st_size):
+                                files[entry.path] = (entry.name, stat.st_size, stat.st_mtime)
+                    except OSError as ex:
+                        _LOGGER.debug("Error reading %s: %s", entry.path, ex)
+        except OSError as ex:
+            _LOGGER.error("Error listing %s: %s", directory, ex)
+        subdirs.sort()
+        return subdirs, files
+
     def get_albums(self) -> List[Album]:
         """Get all available albums."""
         return list(self.albums.values())
@@ -165,70 +1332,112 @@ class LocalPhotosManager:
 
     async def get_media_items(self, album_id: str) -> List[MediaItem]:
         """Get all media items in an album."""
+        album_media = await self._async_get_album_media(album_id)
+        if album_media is None:
+            return []
+        return album_media.items
+
+    async def _async_get_album_media(self, album_id: str) -> AlbumMedia | None:
+        """Get the media of an album, loading it from the index if needed."""
         album = self.get_album(album_id)
         if not album:
             _LOGGER.error("Album not found: %s", album_id)
-            return []
+            return None
 
-        media_items = []
-        
-        # For the ALL album, scan all subdirectories too
-        if album_id == self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL"):
-            # Use async_add_executor_job to run the walk operation in a separate thread
-            def walk_directory():
-                result = []
-                for root, _, files in os.walk(album.path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        result.append((file, file_path))
-                return result
-                
-            file_paths = await self.hass.async_add_executor_job(walk_directory)
-            
-            for file, file_path in file_paths:
-                is_valid = await self.hass.async_add_executor_job(self._is_valid_image, file_path)
-                if is_valid:
-                    media_item = MediaItem(
-                        id=file,
-                        filename=file,
-                        path=file_path
-                    )
-                    media_items.append(media_item)
-        else:
-            # For regular albums, just scan the directory
+        self._async_schedule_rescan()
+
+        album_media = self._album_media.get(album_id)
+        if album_media is not None:
+            return album_media
+
+        generation = self._index_generation
+        self._album_loads += 1
+        try:
             try:
-                dir_files = await self.hass.async_add_executor_job(os.listdir, album.path)
-                for file in dir_files:
-                    file_path = os.path.join(album.path, file)
-                    is_file = await self.hass.async_add_executor_job(os.path.isfile, file_path)
-                    is_valid = False
-                    if is_file:
-                        is_valid = await self.hass.async_add_executor_job(self._is_valid_image, file_path)
-                    if is_file and is_valid:
-                        media_item = MediaItem(
-                            id=file,
-                            filename=file,
-                            path=file_path
-                        )
-                        media_items.append(media_item)
+                tree = await self._async_get_tree()
             except Exception as ex:
                 _LOGGER.error("Error getting media items for album %s: %s", album_id, ex)
+                return None
+
+            # For the ALL album include all subdirectories, regular albums only hold
+            # the files directly inside their directory. Albums share the media items.
+            if album_id == self.config.get(CONF_ALBUM_ID_FAVORITES, "ALL"):
+                media_items = [item for items in tree.values() for item in items]
+            else:
+                media_items = list(tree.get(album.path, ()))
+            album_media = await self.hass.async_add_executor_job(
+                AlbumMedia, media_items
+            )
+
+            # Update the media count for the album
+            album.media_items_count = len(album_media)
+
+            # Keep the list unless the index changed while it was being loaded
+            if generation == self._index_generation:
+                album_media.cursors = self._album_cursors.pop(album_id, {})
+                self._album_media[album_id] = album_media
+        finally:
+            self._album_loads -= 1
+            if not self._album_loads and self._pending_image_info:
+                rows, self._pending_image_info = self._pending_image_info, []
+                self._update_image_info(rows)
+
+        return album_media
+
+    async def _async_get_tree(self) -> Dict[str, List[MediaItem]]:
+        """Get the media of all directories, loading changes from the index."""
+        async with self._tree_lock:
+            if self._tree is None:
+                self._stale_dirs = set()
+                self._tree = await self.hass.async_add_executor_job(self._load_tree, None)
+            elif self._stale_dirs:
+                stale_dirs = self._stale_dirs
+                self._stale_dirs = set()
+                loaded = await self.hass.async_add_executor_job(
+                    self._load_tree, stale_dirs
+                )
+                for directory in stale_dirs:
+                    if directory in loaded:
+                        self._tree[directory] = loaded[directory]
+                    else:
+                        self._tree.pop(directory, None)
+            return self._tree
+
+    def _load_tree(self, directories: Set[str] | None) -> Dict[str, List[MediaItem]]:
+        """Load the media of all, or of the given directories from the index.
 
-        # Update the media count for the album
-        album.media_items_count = len(media_items)
-        
-        # Sort media items alphabetically by filename
-        media_items.sort(key=lambda item: item.filename.lower())
-        
-        return media_items
+        This is a synchronous method that should be called using async_add_executor_job
+        """
+        if directories is None:
+            rows = self._index.get_media()
+        else:
+            rows = [
+                row for directory in directories for row in self._index.get_media(directory)
+            ]
+        tree: Dict[str, List[MediaItem]] = {}
+        for path, directory, filename, _, mtime, *info in rows:
+            exif = ExifInfo(*info[4:-1], has_gps=bool(info[-1]))
+            tree.setdefault(directory, []).append(
+                MediaItem(
+                    id=self._media_id(path),
+                    filename=filename,
+                    path=path,
+                    mtime=mtime,
+                    width=info[0],
+                    height=info[1],
+                    orientation=info[2],
+                    taken=info[3],
+                    exif=exif if any(exif) else None,
+                )
+            )
+        return tree
 
     async def get_media_item(self, album_id: str, media_id: str) -> Optional[MediaItem]:
         """Get a specific media item by ID."""
-        media_items = await self.get_media_items(album_id)
-        for item in media_items:
-            if item.id == media_id:
-                return item
-        return None
+        album_media = await self._async_get_album_media(album_id)
+        if album_media is None:
+            return None
+        return album_media.get(media_id)
 
     async def get_random_media_item(self, album_id: str) -> Optional[MediaItem]:
         """Get a random media item from an album."""
@@ -237,30 +1446,55 @@ class LocalPhotosManager:
             return None
         return random.choice(media_items)
 
-    async def get_next_media_item(self, album_id: str, current_media_id: str) -> Optional[MediaItem]:
-        """Get the next media item in alphabetical order."""
-        media_items = await self.get_media_items(album_id)
-        if not media_items:
+    async def get_random_media_item_with_orientation(
+        self, album_id: str, portrait: bool, exclude_id: str | None = None
+    ) -> Optional[MediaItem]:
+        """Get a random portrait or landscape media item from an album.
+
+        Only items with indexed dimensions are considered.
+        """
+        album_media = await self._async_get_album_media(album_id)
+        if album_media is None:
+            return None
+        pool = album_media.portrait if portrait else album_media.landscape
+        return pool.sample(exclude_id)
+
+    async def get_best_fit_media_item_with_orientation(
+        self,
+        album_id: str,
+        portrait: bool,
+        target: Tuple[float, float],
+        candidates: int,
+        cut_loss: Callable[[Tuple[float, float], Tuple[Any, Any]], Any],
+        exclude_id: str | None = None,
+    ) -> Optional[MediaItem]:
+        """Get a random portrait or landscape item among the best fits for target."""
+        album_media = await self._async_get_album_media(album_id)
+        if album_media is None:
             return None
-            
-        # If no current media, return the first one
-        if not current_media_id:
-            return media_items[0]
-            
-        # Find the current media in the list
-        current_index = -1
-        for i, item in enumerate(media_items):
-            if item.id == current_media_id:
-                current_index = i
-                break
-                
-        # If found, return the next one (or loop back to the first)
-        if current_index >= 0:
-            next_index = (current_index + 1) % len(media_items)
-            return media_items[next_index]
-        
-        # If not found, return the first one
-        return media_items[0]
+        pool = album_media.portrait if portrait else album_media.landscape
+        return pool.sample_best_fit(target, candidates, cut_loss, exclude_id)
+
+    async def get_next_media_item(
+        self,
+        album_id: str,
+        current_media_id: str,
+        order: str = SETTING_IMAGESELECTION_MODE_ALPHABETICAL,
+    ) -> Optional[MediaItem]:
+        """Get the next media item in alphabetical, date taken or file modified order."""
+        album_media = await self._async_get_album_media(album_id)
+        if album_media is None:
+            return None
+        return album_media.next_item(current_media_id, order)
+
+    def _media_id(self, path: str) -> str:
+        """Return the id of a media file.
+
+        Filenames are not unique across folders, so the id is a hash of the path
+        relative to the photos directory. It does not change across restarts.
+        """
+        rel_path = path[len(self.photos_dir) :].lstrip(os.sep).replace(os.sep, "/")
+        return hashlib.sha1(rel_path.encode()).hexdigest()[:16]
 
     def get_media_url(self, media_item: MediaItem) -> str:
         """Get the URL for a media item that can be used in Home Assistant."""
@@ -269,32 +1503,25 @@ class LocalPhotosManager:
         rel_path = os.path.relpath(media_item.path, self.base_path)
         return f"/local/{rel_path}"
 
-    def _is_valid_image(self, file_path: str) -> bool:
-        """Check if a file is a valid image.
-        
-        This is a synchronous method that should be called using async_add_executor_job
+    @staticmethod
+    def _has_supported_extension(filename: str) -> bool:
+        """Check if a filename has a supported image extension."""
+        _, ext = os.path.splitext(filename.lower())
+        return ext in SUPPORTED_EXTENSIONS
+
+    def _is_valid_image(self, file_path: str, file_size: int) -> bool:
+        """Check if a regular file with a supported extension is a valid image.
+
+        Only uses the path and the size from an earlier stat, so it does no I/O.
         """
-        # Check file extension
-        _, ext = os.path.splitext(file_path.lower())
-        if ext not in SUPPORTED_EXTENSIONS:
+        # Skip files that are too large (limit to 20MB)
+        if file_size > 20 * 1024 * 1024:  # 20MB
+            _LOGGER.warning("File too large (>20MB): %s", file_path)
             return False
-            
-        # Verify it's a file and not too large (limit to 20MB)
-        try:
-            if not os.path.isfile(file_path):
-                return False
-                
-            file_size = os.path.getsize(file_path)
-            if file_size > 20 * 1024 * 1024:  # 20MB
-                _LOGGER.warning("File too large (>20MB): %s", file_path)
-                return False
-                
-            # Additional check using mimetypes
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if not mime_type or not mime_type.startswith('image/'):
-                return False
-                
-            return True
-        except Exception as ex:
-            _LOGGER.error("Error checking image file %s: %s", file_path, ex)
+
+        # Additional check using mimetypes
+        mime_type, _ = mimetypes.guess_type(file_path)
+        if not mime_type or not mime_type.startswith('image/'):
             return False
+
+        return True
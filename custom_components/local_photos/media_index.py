@@ -0,0 +1,226 @@
+"""Persistent media index for Local Photos."""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 4
+
+# (path, directory, filename, size, mtime)
+MediaRow = Tuple[str, str, str, int, float]
+# Image info columns, in the order of ImageInfo in local_photos.py
+IMAGE_INFO_COLUMNS = (
+    "width",
+    "height",
+    "orientation",
+    "taken",
+    "camera_make",
+    "camera_model",
+    "exposure_time",
+    "f_number",
+    "iso",
+    "focal_length",
+    "has_gps",
+)
+# (*image info, path, mtime), 0x0 for files that could not be read
+ImageInfoRow = Tuple
+# (path, parent, mtime)
+DirectoryRow = Tuple[str, Optional[str], Optional[float]]
+
+
+class MediaIndex:
+    """SQLite backed index of all media files below the photos directory.
+
+    Next to the media files the index remembers the mtime of every directory it
+    listed, so a rescan only has to list directories that changed since.
+
+    All methods are blocking and should be called using async_add_executor_job.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """Initialize the media index."""
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """Open the database, creating it if needed.
+
+        The index only mirrors the photos directory, so a database that cannot
+        be read is deleted and built again by the next scan.
+        """
+        with self._lock:
+            if self._conn is not None:
+                return
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            try:
+                self._connect()
+            except sqlite3.DatabaseError as ex:
+                _LOGGER.warning(
+                    "Media index %s cannot be read, rebuilding it: %s", self.db_path, ex
+                )
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                for suffix in ("", "-journal", "-wal", "-shm"):
+                    try:
+                        os.unlink(self.db_path + suffix)
+                    except FileNotFoundError:
+                        pass
+                self._connect()
+
+    def _connect(self) -> None:
+        """Connect to the database and create or migrate its schema."""
+        # Executor jobs run on different worker threads, access is guarded by _lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version in (2, 3):
+            _LOGGER.debug("Adding image info to media index %s", self.db_path)
+            statements = []
+            if version == 2:
+                statements += [
+                    "ALTER TABLE media ADD COLUMN width INTEGER",
+                    "ALTER TABLE media ADD COLUMN height INTEGER",
+                    "ALTER TABLE media ADD COLUMN orientation INTEGER",
+                ]
+            statements += [
+                "ALTER TABLE media ADD COLUMN taken REAL",
+                "ALTER TABLE media ADD COLUMN camera_make TEXT",
+                "ALTER TABLE media ADD COLUMN camera_model TEXT",
+                "ALTER TABLE media ADD COLUMN exposure_time REAL",
+                "ALTER TABLE media ADD COLUMN f_number REAL",
+                "ALTER TABLE media ADD COLUMN iso INTEGER",
+                "ALTER TABLE media ADD COLUMN focal_length REAL",
+                "ALTER TABLE media ADD COLUMN has_gps INTEGER",
+                # Read the headers of all files again to get their metadata
+                "UPDATE media SET width = NULL",
+            ]
+            with self._conn:
+                for statement in statements:
+                    self._conn.execute(statement)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif version != SCHEMA_VERSION:
+            _LOGGER.debug("Creating media index %s", self.db_path)
+            self._conn.executescript(
+                """
+                DROP TABLE IF EXISTS media;
+                DROP TABLE IF EXISTS directories;
+                CREATE TABLE media (
+                    path TEXT PRIMARY KEY,
+                    directory TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    width INTEGER,
+                    height INTEGER,
+                    orientation INTEGER,
+                    taken REAL,
+                    camera_make TEXT,
+                    camera_model TEXT,
+                    exposure_time REAL,
+                    f_number REAL,
+                    iso INTEGER,
+                    focal_length REAL,
+                    has_gps INTEGER
+                );
+                CREATE INDEX media_directory ON media (directory);
+                CREATE TABLE directories (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime REAL
+                );
+                """
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def count(self) -> int:
+        """Return the number of indexed media files."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+
+    def get_media(self, directory: str | None = None) -> List[Tuple]:
+        """Return all media, or the media of one directory.
+
+        Rows are (path, directory, filename, size, mtime, *image info), the image
+        info is None until set_image_info was called for the file.
+        """
+        columns = "path, directory, filename, size, mtime, " + ", ".join(
+            IMAGE_INFO_COLUMNS
+        )
+        with self._lock:
+            if directory is None:
+                cursor = self._conn.execute(f"SELECT {columns} FROM media")
+            else:
+                cursor = self._conn.execute(
+                    f"SELECT {columns} FROM media WHERE directory = ?", (directory,)
+                )
+            return cursor.fetchall()
+
+    def get_missing_image_info(self, limit: int) -> List[Tuple[str, float]]:
+        """Return (path, mtime) of up to limit files whose headers were not read."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, mtime FROM media WHERE width IS NULL LIMIT ?", (limit,)
+            ).fetchall()
+
+    def set_image_info(self, rows: Iterable[ImageInfoRow]) -> None:
+        """Store image info, unless the file changed since it was read."""
+        assignments = ", ".join(f"{column} = ?" for column in IMAGE_INFO_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"UPDATE media SET {assignments} WHERE path = ? AND mtime = ?",
+                rows,
+            )
+
+    def get_directories(self) -> Dict[str, Tuple[Optional[str], Optional[float]]]:
+        """Return all known directories as {path: (parent, mtime)}."""
+        with self._lock:
+            return {
+                row[0]: (row[1], row[2])
+                for row in self._conn.execute(
+                    "SELECT path, parent, mtime FROM directories"
+                )
+            }
+
+    def apply_changes(
+        self,
+        upserted_media: Iterable[MediaRow] = (),
+        removed_media: Iterable[str] = (),
+        upserted_directories: Iterable[DirectoryRow] = (),
+        removed_directories: Iterable[str] = (),
+    ) -> None:
+        """Write a set of changes in a single transaction.
+
+        Removing a directory also removes all media directly inside it. Upserted
+        media lose their image info, it is read again for the new file.
+        """
+        with self._lock, self._conn:
+            for path in removed_directories:
+                self._conn.execute("DELETE FROM directories WHERE path = ?", (path,))
+                self._conn.execute("DELETE FROM media WHERE directory = ?", (path,))
+            self._conn.executemany(
+                "DELETE FROM media WHERE path = ?",
+                ((path,) for path in removed_media),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO media (path, directory, filename, size, mtime) "
+                "VALUES (?, ?, ?, ?, ?)",
+                upserted_media,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+                upserted_directories,
+            )
@@ -0,0 +1,282 @@
+"""Render backends for Local Photos."""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+import heapq
+import itertools
+import logging
+import multiprocessing
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Hashable, Iterator, List
+
+from homeassistant.core import HomeAssistant
+
+from . import image_transform
+from .const import RENDER_THREADS
+from .image_transform import RenderJob, render_job
+
+_LOGGER = logging.getLogger(__name__)
+
+# Name image_transform is loaded under for the worker processes. Importing it
+# from the package would run the integration's __init__ in every worker, and
+# with it most of Home Assistant. It only needs Pillow.
+WORKER_MODULE = "local_photos_render_worker"
+# Run by every worker when it starts, and once in Home Assistant to pickle jobs
+WORKER_SETUP = f"""
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location(
+    {WORKER_MODULE!r}, {image_transform.__file__!r}
+)
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+spec.loader.exec_module(module)
+"""
+
+# Priorities of jobs waiting for a render slot, lower values run first
+PRIORITY_INTERACTIVE = 0  # Images a dashboard is waiting for
+PRIORITY_BACKGROUND = 1  # Prefetching and reading image headers
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RenderBackend:
+    """Runs image jobs on its own threads or in worker processes, by priority.
+
+    Rendering is CPU bound and mostly holds the GIL, so with several albums it
+    can take up a core shared with everything else running in Home Assistant.
+    With workers > 0 images are rendered in a pool of processes instead. When a
+    worker dies, for example killed for using too much memory, the pool is
+    started again and the job retried once.
+
+    Background jobs run on up to one thread or worker per slot, interactive
+    jobs may use one more thread that is kept free for them. The others wait in
+    a queue where interactive jobs go before background jobs, so an image
+    requested by a dashboard only waits for other interactive jobs. When all
+    workers are busy and some with background jobs, an interactive render runs
+    on the spare thread instead of waiting for them.
+    """
+
+    def __init__(self, hass: HomeAssistant, workers: int) -> None:
+        """Initialize the render backend."""
+        self.hass = hass
+        self.workers = workers
+        self.slots = workers if workers > 0 else RENDER_THREADS
+        self._executor = ThreadPoolExecutor(
+            self.slots + 1, thread_name_prefix="local_photos_render"
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self.restarts = 0
+        self._running = 0
+        self._pool_jobs = 0
+        self._pool_background_jobs = 0
+        # Heap of [priority, sequence, future, owner], see _async_acquire
+        self._queue: List[List] = []
+        self._sequence = itertools.count()
+        self._boosted: Dict[Hashable, int] = {}
+        # (jobs, total seconds waited, longest wait) by priority
+        self._waits = {priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the configuration, queue depth and waiting times of the backend."""
+        stats: Dict[str, Any] = {
+            "workers": self.workers,
+            "slots": self.slots,
+            "restarts": self.restarts,
+            "running": self._running,
+        }
+        for priority, name in PRIORITY_NAMES.items():
+            jobs, total, longest = self._waits[priority]
+            stats[name] = {
+                "queued": sum(1 for entry in self._queue if entry[0] == priority),
+                "jobs": jobs,
+                "mean_wait_ms": round(total / jobs * 1000, 1) if jobs else 0.0,
+                "max_wait_ms": round(longest * 1000, 1),
+            }
+        return stats
+
+    async def async_render(
+        self,
+        job: RenderJob,
+        priority: int = PRIORITY_INTERACTIVE,
+        owner: Hashable | None = None,
+    ) -> bytes:
+        """Render and encode an image."""
+        priority = await self._async_acquire(priority, owner)
+        try:
+            if self.workers <= 0 or (
+                self._pool_jobs >= self.workers and self._pool_background_jobs
+            ):
+                return await self.hass.loop.run_in_executor(
+                    self._executor, render_job, job
+                )
+            background = priority != PRIORITY_INTERACTIVE
+            self._pool_jobs += 1
+            self._pool_background_jobs += background
+            try:
+                return await self._async_render_in_pool(job)
+            except BrokenProcessPool:
+                _LOGGER.warning("Render worker stopped unexpectedly, restarting workers")
+                return await self._async_render_in_pool(job)
+            finally:
+                self._pool_jobs -= 1
+                self._pool_background_jobs -= background
+        finally:
+            self._release()
+
+    async def async_run(
+        self,
+        target: Callable[..., Any],
+        *args: Any,
+        priority: int = PRIORITY_BACKGROUND,
+        owner: Hashable | None = None,
+    ) -> Any:
+        """Run a blocking image function, like reading headers, on a render thread."""
+        await self._async_acquire(priority, owner)
+        try:
+            return await self.hass.loop.run_in_executor(self._executor, target, *args)
+        finally:
+            self._release()
+
+    @contextmanager
+    def boost(self, owner: Hashable) -> Iterator[None]:
+        """Run the background jobs of owner as interactive while inside.
+
+        Used while a dashboard waits for work that was started in the
+        background, like a prefetch, so it does not wait behind other albums.
+        """
+        self._boosted[owner] = self._boosted.get(owner, 0) + 1
+        boosted = False
+        for entry in self._queue:
+            if entry[3] == owner and entry[0] != PRIORITY_INTERACTIVE:
+                entry[0] = PRIORITY_INTERACTIVE
+                boosted = True
+        if boosted:
+            heapq.heapify(self._queue)
+            self._dispatch()
+        try:
+            yield
+        finally:
+            count = self._boosted.pop(owner) - 1
+            if count:
+                self._boosted[owner] = count
+
+    def _can_start(self, priority: int) -> bool:
+        """Return if a job of the given priority may take a slot now."""
+        if priority == PRIORITY_INTERACTIVE:
+            return self._running <= self.slots
+        return self._running < self.slots
+
+    async def _async_acquire(self, priority: int, owner: Hashable | None) -> int:
+        """Wait for a free slot, behind all queued jobs of the same or higher priority.
+
+        Returns the priority the job got the slot with, it may have been boosted.
+        """
+        if owner is not None and owner in self._boosted:
+            priority = PRIORITY_INTERACTIVE
+        start = time.monotonic()
+        if (not self._queue or self._queue[0][0] > priority) and self._can_start(
+            priority
+        ):
+            self._running += 1
+        else:
+            future = self.hass.loop.create_future()
+            entry = [priority, next(self._sequence), future, owner]
+            heapq.heappush(self._queue, entry)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    self._queue = [queued for queued in self._queue if queued is not entry]
+                    heapq.heapify(self._queue)
+                else:
+                    # The slot was handed over just before the caller gave up
+                    self._release()
+                raise
+            # Boosting may have changed the priority while waiting
+            priority = entry[0]
+        wait = time.monotonic() - start
+        waits = self._waits[priority]
+        waits[0] += 1
+        waits[1] += wait
+        waits[2] = max(waits[2], wait)
+        return priority
+
+    def _release(self) -> None:
+        """Free a slot and hand it to the next queued job."""
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are slots free for their priority."""
+        while self._queue and self._can_start(self._queue[0][0]):
+            future = heapq.heappop(self._queue)[2]
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    async def _async_render_in_pool(self, job: RenderJob) -> bytes:
+        """Render a job in the worker pool, starting it if needed."""
+        pool = self._pool
+        if pool is None:
+            # Workers are not forked from Home Assistant, which runs many threads
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            pool = self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=context,
+                initializer=exec,
+                initargs=(WORKER_SETUP,),
+            )
+        worker = _get_worker_module()
+        # Jobs are sent as the classes of the worker module, so unpickling them
+        # does not import the package either
+        worker_job = worker.RenderJob(
+            tuple(worker.RenderSource(*source) for source in job.sources), *job[1:]
+        )
+        try:
+            # Submitting can start worker processes, keep that off the event loop
+            future = await self.hass.loop.run_in_executor(
+                self._executor, pool.submit, worker.render_job, worker_job
+            )
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # All jobs in the broken pool fail, only the first one replaces it
+            if self._pool is pool:
+                self._pool = None
+                self.restarts += 1
+                self.hass.async_add_executor_job(
+                    partial(pool.shutdown, wait=False, cancel_futures=True)
+                )
+            raise
+
+    async def async_shutdown(self) -> None:
+        """Stop the worker processes and render threads, cancelling queued jobs."""
+        queue, self._queue = self._queue, []
+        for entry in queue:
+            entry[2].cancel()
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await self.hass.async_add_executor_job(
+                partial(pool.shutdown, wait=True, cancel_futures=True)
+            )
+        await self.hass.async_add_executor_job(
+            partial(self._executor.shutdown, wait=True, cancel_futures=True)
+        )
+
+
+def _get_worker_module() -> ModuleType:
+    """Get image_transform as loaded in the worker processes."""
+    if WORKER_MODULE not in sys.modules:
+        exec(WORKER_SETUP)
+    return sys.modules[WORKER_MODULE]
@@ -0,0 +1,203 @@
+"""Disk cache of resized and cropped images for Local Photos."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Hashable, Iterable
+
+_LOGGER = logging.getLogger(__name__)
+
+TEMP_SUFFIX = ".tmp"
+
+
+class RenditionCache:
+    """Least recently used cache of rendered images, limited to max_bytes on disk.
+
+    Entries are keyed by the path, mtime and size of the source files and the
+    parameters they were rendered with, so changed files are never served from
+    the cache and their old renditions are evicted in time. The order of use is
+    kept in the mtime of the cached files so it survives restarts.
+
+    All methods are blocking and should be called using async_add_executor_job.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize the rendition cache."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Return if renditions are cached."""
+        return self.max_bytes > 0
+
+    @property
+    def size(self) -> int:
+        """Return the number of bytes used on disk."""
+        return self._size
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the size of the cache."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def load(self) -> None:
+        """Read the cached entries from disk, removing leftovers of failed writes."""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    if entry.name.endswith(TEMP_SUFFIX):
+                        os.unlink(entry.path)
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+        with self._lock:
+            self._entries = OrderedDict((name, size) for _, name, size in entries)
+            self._size = sum(self._entries.values())
+            self._evict()
+        _LOGGER.debug(
+            "Loaded %d cached renditions (%d bytes) from %s",
+            len(self._entries),
+            self._size,
+            self.directory,
+        )
+
+    @staticmethod
+    def get_key(paths: Iterable[str], *params) -> str:
+        """Return the cache key for a rendition of the given source files.
+
+        Raises OSError if a source file does not exist.
+        """
+        sources = []
+        for path in paths:
+            stat = os.stat(path)
+            sources.append((path, stat.st_mtime_ns, stat.st_size))
+        return hashlib.sha1(repr((sources, params)).encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Return a cached rendition, None if it is not cached."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except OSError as ex:
+            _LOGGER.debug("Error reading cached rendition %s: %s", path, ex)
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store a rendition, evicting the least recently used ones over budget."""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        try:
+            # Write to a temporary file first so readers never see partial files
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                with self._lock:
+                    os.replace(temp_path, os.path.join(self.directory, key))
+                    self._size += len(data) - self._entries.pop(key, 0)
+                    self._entries[key] = len(data)
+                    self._evict()
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+        except OSError as ex:
+            _LOGGER.debug("Error writing cached rendition %s: %s", key, ex)
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its budget."""
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.unlink(os.path.join(self.directory, key))
+            except OSError:
+                pass
+
+
+class MemoryRenditionCache:
+    """Least recently used cache of rendered images in memory, limited to max_bytes.
+
+    Keeps hit and miss counters to tune the budget. Not thread safe, it is only
+    used from the event loop.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the memory rendition cache."""
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached renditions."""
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Return the number of bytes cached."""
+        return self._size
+
+    def get(self, key: Hashable) -> bytes | None:
+        """Return a cached rendition, None if it is not cached."""
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        """Store a rendition, evicting the least recently used ones over budget."""
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return the size and hit counters of the cache."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
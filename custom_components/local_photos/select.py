@@ -17,10 +17,14 @@ from .const import (
     SETTING_IMAGESELECTION_MODE_OPTIONS,
     SETTING_INTERVAL_DEFAULT_OPTION,
     SETTING_INTERVAL_OPTIONS,
+    SETTING_OUTPUT_FORMAT_DEFAULT_OPTION,
+    SETTING_OUTPUT_FORMAT_MAP,
+    SETTING_OUTPUT_FORMAT_OPTIONS,
     SETTING_ASPECT_RATIO_DEFAULT_OPTION,
     SETTING_ASPECT_RATIO_OPTIONS,
 )
 from .coordinator import Coordinator, CoordinatorManager
+from .image_transform import is_output_format_supported
 
 
 async def async_setup_entry(
@@ -38,6 +42,7 @@ async def async_setup_entry(
         entities.append(LocalPhotosSelectImageSelectionMode(coordinator))
         entities.append(LocalPhotosSelectInterval(coordinator))
         entities.append(LocalPhotosSelectAspectRatio(coordinator))
+        entities.append(LocalPhotosSelectOutputFormat(coordinator))
 
     async_add_entities(
         entities,
@@ -241,3 +246,59 @@ class LocalPhotosSelectAspectRatio(SelectEntity, RestoreEntity):
         else:
             self.coordinator.set_aspect_ratio(state.state)
         self.async_write_ha_state()
+
+
+class LocalPhotosSelectOutputFormat(SelectEntity, RestoreEntity):
+    """Selection of output format"""
+
+    coordinator: Coordinator
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:file-image"
+
+    def __init__(self, coordinator: Coordinator) -> None:
+        """Initialize a sensor class."""
+        super().__init__()
+        self.coordinator = coordinator
+        # Only offer the formats this Pillow build can write
+        self._options = [
+            option
+            for option in SETTING_OUTPUT_FORMAT_OPTIONS
+            if SETTING_OUTPUT_FORMAT_MAP[option] is None
+            or is_output_format_supported(SETTING_OUTPUT_FORMAT_MAP[option])
+        ]
+        self.entity_description = SelectEntityDescription(
+            key="output_format",
+            name="Output format",
+            icon=self._attr_icon,
+            entity_category=EntityCategory.CONFIG,
+            options=self._options,
+        )
+        album_id = self.coordinator.album.id
+        self._attr_device_info = self.coordinator.get_device_info()
+        self._attr_unique_id = f"{album_id}-output-format"
+
+    @property
+    def should_poll(self) -> bool:
+        """No need to poll."""
+        return False
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the selected entity option to represent the entity state."""
+        return self.coordinator.output_format
+
+    async def async_select_option(self, option: str) -> None:
+        """Change the selected option."""
+        if option is not self.coordinator.output_format:
+            self.coordinator.set_output_format(option)
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        await super().async_added_to_hass()
+        state = await self.async_get_last_state()
+        if not state or state.state not in self._options:
+            self.coordinator.set_output_format(SETTING_OUTPUT_FORMAT_DEFAULT_OPTION)
+        else:
+            self.coordinator.set_output_format(state.state)
+        self.async_write_ha_state()
@@ -135,26 +135,9 @@ class LocalPhotosCreationTimestamp(SensorEntity):
     def _read_value(self) -> None:
         val = None
         if self.coordinator.current_media is not None:
-            # For local photos, we need to get the creation time from the file metadata
-            # or use the file's modification time as a fallback
-            try:
-                # Try to get the file's creation time or modification time
-                import os
-                import datetime
-                from datetime import timezone
-                
-                # Get the file path from the MediaItem object
-                file_path = self.coordinator.current_media.path
-                
-                # Try to get the file's modification time
-                if os.path.exists(file_path):
-                    # Get the modification time and convert to datetime with timezone
-                    mtime = os.path.getmtime(file_path)
-                    val = datetime.datetime.fromtimestamp(mtime, tz=timezone.utc)
-            except Exception as ex:
-                # If there's an error, log it and set val to None
-                _LOGGER.warning(f"Error getting creation time for {self.coordinator.current_media.path}: {ex}")
-                val = None
+            # Creation time is taken from the indexed EXIF data, or the file's
+            # modification time found while scanning, so reading it does no I/O
+            val = self.coordinator.current_media.creation_time
                 
         self._attr_native_value = val
         self.async_write_ha_state()
@@ -0,0 +1 @@
+"""Tests for the Local Photos integration."""
@@ -0,0 +1,135 @@
+"""Fixtures for Local Photos tests."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import os
+import time
+from typing import Any, Callable, Dict
+
+from PIL import Image
+import pytest
+
+
+class MockConfig:
+    """Configuration of the mock Home Assistant instance."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the configuration."""
+        self.config_dir = config_dir
+
+    def path(self, *parts: str) -> str:
+        """Get a path relative to the config directory."""
+        return os.path.join(self.config_dir, *parts)
+
+
+class MockHass:
+    """The parts of Home Assistant used by the photos manager and coordinators.
+
+    Create it inside the event loop the test runs in.
+    """
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the mock Home Assistant instance."""
+        self.loop = asyncio.get_running_loop()
+        self.config = MockConfig(config_dir)
+        self.data: Dict[str, Any] = {}
+
+    def async_add_executor_job(self, target: Callable, *args: Any) -> asyncio.Future:
+        """Run a blocking function on the default executor."""
+        return self.loop.run_in_executor(None, target, *args)
+
+    def async_create_task(self, target, name: str | None = None) -> asyncio.Task:
+        """Create a task."""
+        return self.loop.create_task(target, name=name)
+
+    def async_create_background_task(self, target, name: str) -> asyncio.Task:
+        """Create a background task."""
+        return self.loop.create_task(target, name=name)
+
+
+class CountingDirEntry:
+    """Directory entry counting the stat calls made through it."""
+
+    def __init__(self, entry: os.DirEntry, calls: Dict[str, Counter]) -> None:
+        """Initialize the entry."""
+        self._entry = entry
+        self._calls = calls
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self) -> bool:
+        """Return if the entry is a directory, from the listing."""
+        return self._entry.is_dir()
+
+    def is_file(self) -> bool:
+        """Return if the entry is a file, from the listing."""
+        return self._entry.is_file()
+
+    def stat(self) -> os.stat_result:
+        """Stat the entry."""
+        self._calls["stat"][self.path] += 1
+        return self._entry.stat()
+
+
+class CountingScandir:
+    """Directory listing handing out counting entries."""
+
+    def __init__(self, iterator, calls: Dict[str, Counter]) -> None:
+        """Initialize the listing."""
+        self._iterator = iterator
+        self._calls = calls
+
+    def __enter__(self) -> CountingScandir:
+        """Enter the listing."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the listing."""
+        self._iterator.close()
+
+    def __iter__(self):
+        """Iterate over the entries."""
+        for entry in self._iterator:
+            yield CountingDirEntry(entry, self._calls)
+
+
+@pytest.fixture
+def photos_dir(tmp_path) -> str:
+    """Create a photos directory with three albums, one with a subdirectory."""
+    photos = tmp_path / "photos"
+    for album, count in (("a", 3), ("b", 4), ("c", 5), ("a/sub", 2)):
+        (photos / album).mkdir(parents=True)
+        for number in range(count):
+            size = (40, 30) if number % 2 else (30, 40)
+            Image.new("RGB", size).save(photos / album / f"{number}.jpg")
+    # Directories changed within the last seconds are listed again by every scan
+    past = time.time() - 3600
+    for directory in (photos, *photos.glob("**/")):
+        os.utime(directory, (past, past))
+    return str(photos)
+
+
+@pytest.fixture
+def syscalls(monkeypatch, photos_dir: str) -> Dict[str, Counter]:
+    """Count os.scandir and os.stat calls below the photos directory, by path."""
+    calls = {"scandir": Counter(), "stat": Counter()}
+    scandir = os.scandir
+    stat = os.stat
+
+    def counting_scandir(path=".", *args, **kwargs):
+        if not os.fspath(path).startswith(photos_dir):
+            return scandir(path, *args, **kwargs)
+        calls["scandir"][os.fspath(path)] += 1
+        return CountingScandir(scandir(path, *args, **kwargs), calls)
+
+    def counting_stat(path, *args, **kwargs):
+        if isinstance(path, (str, os.PathLike)) and os.fspath(path).startswith(
+            photos_dir
+        ):
+            calls["stat"][os.fspath(path)] += 1
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    monkeypatch.setattr(os, "stat", counting_stat)
+    return calls
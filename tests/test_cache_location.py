@@ -0,0 +1,47 @@
+"""Tests for the location of the media index and resized images."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import os
+from typing import Dict
+
+from custom_components.local_photos.const import CONF_FOLDER_PATH, DOMAIN
+from custom_components.local_photos.local_photos import (
+    async_get_photos_manager,
+    async_release_photos_manager,
+)
+
+from .conftest import MockHass
+
+
+def test_cache_moved_out_of_storage(
+    tmp_path, photos_dir: str, syscalls: Dict[str, Counter]
+) -> None:
+    """Test the index and resized images of earlier versions are moved to .cache."""
+
+    async def run() -> None:
+        hass = MockHass(str(tmp_path))
+        config = {CONF_FOLDER_PATH: photos_dir}
+        manager = await async_get_photos_manager(hass, config)
+        await async_release_photos_manager(hass, manager)
+        cache_dir = tmp_path / ".cache" / DOMAIN
+        legacy_dir = tmp_path / ".storage" / DOMAIN
+        os.makedirs(legacy_dir.parent)
+        os.rename(cache_dir, legacy_dir)
+        assert sorted(os.listdir(legacy_dir)) == [
+            os.path.basename(manager._index.db_path),
+            os.path.basename(manager.rendition_cache.directory),
+        ]
+
+        # The moved index is used, unchanged directories are not listed again
+        syscalls["scandir"].clear()
+        manager = await async_get_photos_manager(hass, config)
+        assert not legacy_dir.exists()
+        assert os.path.isfile(manager._index.db_path)
+        assert os.path.isdir(manager.rendition_cache.directory)
+        assert len(await manager.get_media_items("ALL")) == 14
+        assert set(syscalls["scandir"]) == {photos_dir}
+        await async_release_photos_manager(hass, manager)
+
+    asyncio.run(run())
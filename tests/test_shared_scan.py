@@ -0,0 +1,126 @@
+"""Tests for sharing the scans of a photos directory between config entries."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import os
+from types import SimpleNamespace
+from typing import Dict
+
+from custom_components.local_photos.const import (
+    CONF_ALBUM_ID,
+    CONF_FOLDER_PATH,
+    CONF_SCAN_WORKERS,
+    DATA_PHOTOS_MANAGERS,
+    SCAN_WORKERS_DEFAULT_OPTION,
+)
+from custom_components.local_photos.coordinator import CoordinatorManager
+
+from .conftest import MockHass
+
+ALBUMS = {"ALL": 14, "a": 3, "b": 4, "c": 5}
+
+
+def make_entry(photos_dir: str, album_id: str, **options) -> SimpleNamespace:
+    """Create a config entry holding a single album."""
+    return SimpleNamespace(
+        entry_id=album_id,
+        options={CONF_FOLDER_PATH: photos_dir, CONF_ALBUM_ID: [album_id], **options},
+    )
+
+
+def test_albums_share_one_scan(
+    tmp_path, photos_dir: str, syscalls: Dict[str, Counter]
+) -> None:
+    """Test all albums of a photos directory are served by one scan."""
+
+    async def run() -> None:
+        hass = MockHass(str(tmp_path))
+        entries = {
+            album_id: CoordinatorManager(hass, make_entry(photos_dir, album_id))
+            for album_id in ALBUMS
+        }
+        await asyncio.gather(*(entry.initialize() for entry in entries.values()))
+        photos_manager = entries["ALL"]._photos_manager
+        assert all(
+            entry._photos_manager is photos_manager for entry in entries.values()
+        )
+        assert hass.data[DATA_PHOTOS_MANAGERS] == {photos_dir: photos_manager}
+
+        directories = [
+            os.path.join(photos_dir, directory) for directory in ("a", "a/sub", "b", "c")
+        ]
+        assert all(syscalls["scandir"][directory] == 1 for directory in directories)
+        images = [path for path in syscalls["stat"] if path.endswith(".jpg")]
+        assert len(images) == ALBUMS["ALL"]
+        assert all(syscalls["stat"][path] == 1 for path in images)
+
+        # Selecting images in every album is served from the shared index
+        calls = {name: counter.copy() for name, counter in syscalls.items()}
+        for album_id, count in ALBUMS.items():
+            media_items = await entries[album_id]._photos_manager.get_media_items(
+                album_id
+            )
+            assert len(media_items) == count
+        assert syscalls == calls
+
+        for entry in entries.values():
+            await entry.async_unload()
+        assert hass.data[DATA_PHOTOS_MANAGERS] == {}
+
+    asyncio.run(run())
+
+
+def test_reload_gets_open_manager(
+    tmp_path, photos_dir: str, syscalls: Dict[str, Counter]
+) -> None:
+    """Test reloaded entries use an open manager and new coordinators."""
+
+    async def run() -> None:
+        hass = MockHass(str(tmp_path))
+        first = CoordinatorManager(hass, make_entry(photos_dir, "ALL"))
+        second = CoordinatorManager(hass, make_entry(photos_dir, "a"))
+        await first.initialize()
+        await second.initialize()
+        shared = first._photos_manager
+        assert second._photos_manager is shared
+        assert first.coordinators is not second.coordinators
+
+        # Reloading one entry keeps the manager the other entry still uses
+        await first.async_unload()
+        reloaded = CoordinatorManager(hass, make_entry(photos_dir, "ALL"))
+        await reloaded.initialize()
+        assert reloaded._photos_manager is shared
+        assert reloaded.coordinators == {}
+        assert len(await shared.get_media_items("ALL")) == ALBUMS["ALL"]
+
+        # Changed folder options start a new manager for the reloaded entry
+        changed = CoordinatorManager(
+            hass,
+            make_entry(
+                photos_dir, "a", **{CONF_SCAN_WORKERS: SCAN_WORKERS_DEFAULT_OPTION + 1}
+            ),
+        )
+        await changed.initialize()
+        assert changed._photos_manager is not shared
+        await second.async_unload()
+        assert len(await shared.get_media_items("a")) == ALBUMS["a"]
+        await reloaded.async_unload()
+        assert hass.data[DATA_PHOTOS_MANAGERS] == {photos_dir: changed._photos_manager}
+        await changed.async_unload()
+        assert hass.data[DATA_PHOTOS_MANAGERS] == {}
+
+        # After all entries were unloaded, a new manager starts from the index
+        # and does not list the unchanged directories again
+        syscalls["scandir"].clear()
+        syscalls["stat"].clear()
+        restarted = CoordinatorManager(hass, make_entry(photos_dir, "ALL"))
+        await restarted.initialize()
+        assert restarted._photos_manager is not shared
+        media_items = await restarted._photos_manager.get_media_items("ALL")
+        assert len(media_items) == ALBUMS["ALL"]
+        assert set(syscalls["scandir"]) == {photos_dir}
+        assert not any(path.endswith(".jpg") for path in syscalls["stat"])
+        await restarted.async_unload()
+
+    asyncio.run(run())